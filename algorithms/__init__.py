@@ -1,4 +1,9 @@
-from algorithms.playground import SortPlayground, Pointer, PointerType, READ, WRITE
+from algorithms.storage import Storage, ListStorage, NumpyStorage, NumpyInt32Storage, storages
+from algorithms.comparison import Comparator, OPERATORS
+from algorithms.trace import TraceRecorder, read_trace
+from algorithms.dirty import DirtyTracker, DirtyReader
+from algorithms.palettes import Palette, ColorTable, RainbowPalette, GrayscalePalette, HighContrastPalette, palettes
+from algorithms.playground import SortPlayground, AccessRegister, Pointer, PointerType, READ, WRITE
 from algorithms.sorts import *
 from algorithms.algorithms import *
 from algorithms.algorithm import Option
@@ -0,0 +1,46 @@
+"""
+Measures how fast the algorithms run without the UI.
+
+Run it with `python -m algorithms.benchmark`.
+"""
+from algorithms.playground import SortPlayground
+from algorithms.comparison import Comparator
+from algorithms.algorithms import Shuffle
+from algorithms.sorts import BubbleSort, QuickSort, Concurrent
+from time import perf_counter
+
+
+def comparison_rate(sort_cls, main_array_len: int, seconds: float = 2.0, comparator: Comparator | None = None) -> float:
+    """
+    Runs `sort_cls` on a shuffled main array of length `main_array_len`
+    for up to `seconds` seconds, and returns how many comparisons
+    it made per second.
+    """
+    playground = SortPlayground(main_array_len, comparator=comparator)
+
+    for _ in Shuffle(playground).run():
+        pass
+    playground.reset()
+    # Only count the sort's comparisons.
+
+    sort = sort_cls(playground)
+    if isinstance(sort, Concurrent):
+        sort.prepare()
+    # Networks are compiled before the clock starts (see `Concurrent.run`).
+
+    start = perf_counter()
+    for step, _ in enumerate(sort.run()):
+        if not step & 1023 and perf_counter() - start >= seconds:
+            break
+    # Checking the clock every step would slow the sort down.
+
+    return playground.statistics.comparisons / (perf_counter() - start)
+
+
+def main():
+    for sort_cls in (BubbleSort, QuickSort):
+        print(f"{sort_cls.__doc__} (n=4096): {comparison_rate(sort_cls, 4096):,.0f} comparisons/s")
+
+
+if __name__ == "__main__":
+    main()
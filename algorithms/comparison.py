@@ -0,0 +1,69 @@
+from dataclasses import dataclass, field
+from typing import Callable
+import numpy
+import operator
+
+Comparison = Callable[[object, object], bool]
+
+OPERATORS: dict[str, Comparison] = {
+    ">": operator.gt,
+    "<": operator.lt,
+    ">=": operator.ge,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+"""Every comparison string the algorithms can pass to `SortPlayground.compare`."""
+
+
+@dataclass
+class Comparator:
+    """
+    Turns comparison strings (">", "<=", etc) into comparison functions.
+
+    Each comparison string is only resolved once, the first time it's used,
+    and the resulting function is kept in `self.compiled`.
+
+    Custom orderings can be plugged in with `key`, which is applied
+    to both numbers before comparing them, and/or with `cmp`,
+    which takes both numbers and returns a negative number, zero
+    or a positive number, like the functions in `functools.cmp_to_key`.
+    """
+    key: Callable[[object], object] | None = None
+    cmp: Callable[[object, object], int] | None = None
+    compiled: dict[str, Comparison] = field(default_factory=dict)
+
+    def compile(self, comparison: str) -> Comparison:
+        """Builds the comparison function for `comparison`."""
+        if not (comparison in OPERATORS):
+            raise ValueError(f"Invalid comparison '{comparison}'.")
+
+        compare: Comparison = OPERATORS[comparison]
+        key = self.key
+        cmp = self.cmp
+
+        if key is None and cmp is None:
+            return compare
+        if cmp is None:
+            return lambda a, b: compare(key(a), key(b))
+        if key is None:
+            return lambda a, b: compare(cmp(a, b), 0)
+        return lambda a, b: compare(cmp(key(a), key(b)), 0)
+
+    def compare_arrays(self, comparison: str, nums_a: numpy.ndarray, nums_b: numpy.ndarray) -> numpy.ndarray:
+        """Compares each of `nums_a` with the num at the same position of `nums_b`, all at once when possible."""
+        if self.key is None and self.cmp is None and comparison in OPERATORS:
+            return OPERATORS[comparison](nums_a, nums_b)
+        # The operators compare NumPy arrays element by element.
+        # (Invalid comparisons go through `self.resolve`, to raise the same error as everywhere else.)
+
+        compare = self.resolve(comparison)
+        return numpy.fromiter(map(compare, nums_a.tolist(), nums_b.tolist()), dtype=bool, count=len(nums_a))
+
+    def resolve(self, comparison: str) -> Comparison:
+        """Returns the (cached) comparison function for `comparison`."""
+        try:
+            return self.compiled[comparison]
+        except KeyError:
+            self.compiled[comparison] = self.compile(comparison)
+            return self.compiled[comparison]
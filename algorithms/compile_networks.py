@@ -0,0 +1,57 @@
+"""
+Compiles the sorting networks into the cache (see `algorithms.networks`), and shows their sizes and depths.
+
+Run it with `python -m algorithms.compile_networks --help`.
+"""
+from algorithms.networks import NetworkCache, network_cache, apply_network
+from algorithms.sorts import Concurrent, sorts
+from time import perf_counter
+import argparse
+import numpy
+import sys
+
+
+def main(argv: list[str] | None = None) -> int:
+    network_classes = {sort_cls.__doc__: sort_cls for sort_cls in sorts if issubclass(sort_cls, Concurrent)}
+
+    parser = argparse.ArgumentParser(description="Compiles the sorting networks, and shows their sizes and depths.")
+    parser.add_argument("--size", type=int, action="append",
+                        help="Can be given several times. Defaults to 1024.")
+    parser.add_argument("--sort", action="append", choices=network_classes.keys(),
+                        help="Can be given several times. Compiles every network by default.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Compiles every network, without reading or writing the cache.")
+    parser.add_argument("--check", action="store_true",
+                        help="Sorts a shuffled array with each network (see `apply_network`).")
+    args = parser.parse_args(argv)
+
+    cache = NetworkCache(None) if args.no_cache else network_cache
+    all_sorted = True
+
+    for main_array_len in args.size or [1024]:
+        for name in args.sort or network_classes.keys():
+            try:
+                network = cache.get(network_classes[name], main_array_len)
+            except IndexError as error:
+                print(f"{name} (n={main_array_len}): doesn't work for this length ({error})")
+                continue
+
+            print(network)
+
+            if args.check:
+                array = numpy.random.permutation(main_array_len) + 1
+
+                start = perf_counter()
+                swaps = apply_network(network, array)
+                seconds = perf_counter() - start
+
+                is_sorted = bool(numpy.all(array[:-1] <= array[1:]))
+                all_sorted &= is_sorted
+                print(f"    {'sorted' if is_sorted else 'NOT SORTED'} with {swaps} swaps in {seconds:.3f}s")
+
+    print(cache)
+    return 0 if all_sorted else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
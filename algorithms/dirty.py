@@ -0,0 +1,123 @@
+from typing import Sized
+import numpy
+
+BLOCK_SHIFT = 6
+BLOCK_SIZE = 1 << BLOCK_SHIFT
+"""How many positions share a block stamp."""
+
+
+class DirtyTracker:
+    """
+    Keeps track of which positions of the arrays of a `SortPlayground` were written,
+    so each consumer (like a renderer) only has to look at the positions
+    that changed since the last time it checked (see `DirtyReader`).
+
+    Every write stamps its position with the current `self.epoch`,
+    and every time a reader checks, the epoch goes up,
+    so any amount of readers can share the same stamps.
+
+    Writes also stamp the block of `BLOCK_SIZE` positions they're in (in `self.block_stamps`),
+    so readers only scan the stamps of blocks that were written,
+    instead of the stamps of every position.
+
+    When arrays are spawned, deleted or replaced, `self.layout_epoch`
+    is updated instead, and every reader has to treat every position as changed.
+    """
+
+    def __init__(self, arrays: list[Sized]):
+        self.epoch: int = 1
+        self.layout_epoch: int = 1
+        self.stamps: list[numpy.ndarray] = []
+        self.block_stamps: list[numpy.ndarray] = []
+
+        self.relayout(arrays)
+
+    def relayout(self, arrays: list[Sized]):
+        """Starts over with `arrays`, which may have been spawned, deleted or replaced."""
+        self.stamps = [numpy.zeros(len(array), dtype=numpy.int64) for array in arrays]
+        self.block_stamps = [numpy.zeros(block_count(len(array)), dtype=numpy.int64) for array in arrays]
+        self.layout_epoch = self.epoch
+
+    def mark(self, array_index: int, index: int):
+        """Stamps one position as written."""
+        epoch = self.epoch
+        self.stamps[array_index][index] = epoch
+        self.block_stamps[array_index][index >> BLOCK_SHIFT] = epoch
+
+    def mark_slice(self, array_index: int, start: int, end: int):
+        """Stamps the positions from `start` to `end` as written."""
+        if start >= end:
+            return
+
+        self.stamps[array_index][start:end] = self.epoch
+        self.block_stamps[array_index][start >> BLOCK_SHIFT:((end - 1) >> BLOCK_SHIFT) + 1] = self.epoch
+
+    def mark_all(self, array_index: int, indices: numpy.ndarray):
+        """Stamps every position in `indices` as written."""
+        self.stamps[array_index][indices] = self.epoch
+        self.block_stamps[array_index][indices >> BLOCK_SHIFT] = self.epoch
+
+    def reader(self) -> "DirtyReader":
+        return DirtyReader(self)
+
+
+class DirtyReader:
+    """One consumer of a `DirtyTracker`, with its own idea of what's new."""
+
+    def __init__(self, tracker: DirtyTracker):
+        self.tracker = tracker
+        self.seen_epoch: int = 0
+
+    def read(self) -> list[numpy.ndarray] | None:
+        """
+        Returns, for each array, the (sorted) indices that were written
+        since the last call.
+
+        Returns None if arrays were spawned, deleted or replaced since the last call,
+        meaning everything should be considered changed.
+        """
+        tracker = self.tracker
+        seen_epoch = self.seen_epoch
+
+        tracker.epoch += 1
+        self.seen_epoch = tracker.epoch
+        # Writes from now on will be new next time.
+        # (Writes that happen while scanning may be reported twice, but never missed.)
+
+        if tracker.layout_epoch >= seen_epoch:
+            return None
+
+        return [written_since(stamps, block_stamps, seen_epoch) for stamps, block_stamps in zip(tracker.stamps, tracker.block_stamps)]
+
+
+def block_count(length: int) -> int:
+    return (length + BLOCK_SIZE - 1) >> BLOCK_SHIFT
+
+
+def written_since(stamps: numpy.ndarray, block_stamps: numpy.ndarray, epoch: int) -> numpy.ndarray:
+    """
+    The (sorted) indices of `stamps` stamped with `epoch` or later,
+    only looking at the positions of the blocks stamped with `epoch` or later in `block_stamps`.
+    """
+    written_blocks = numpy.flatnonzero(block_stamps >= epoch)
+    if not len(written_blocks):
+        return written_blocks
+
+    candidates = ((written_blocks << BLOCK_SHIFT)[:, None] + numpy.arange(BLOCK_SIZE)).ravel()
+    if candidates[-1] >= len(stamps):
+        candidates = candidates[candidates < len(stamps)]
+    # The last block can be shorter.
+
+    return candidates[stamps[candidates] >= epoch]
+
+
+def ranges(indices: numpy.ndarray) -> list[tuple[int, int]]:
+    """Groups sorted `indices` into a list of `(start, end)` ranges of consecutive indices."""
+    if not len(indices):
+        return []
+
+    breaks = numpy.flatnonzero(numpy.diff(indices) != 1) + 1
+    starts = numpy.concatenate(([indices[0]], indices[breaks]))
+    ends = numpy.concatenate((indices[breaks - 1], [indices[-1]])) + 1
+
+    return list(zip(starts.tolist(), ends.tolist()))
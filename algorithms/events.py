@@ -0,0 +1,97 @@
+import numpy
+
+EVENTS_CAPACITY = 1 << 16
+
+
+class AccessEvents:
+    """
+    A ring buffer of the nums accessed by a `SortPlayground`, each with the time it was accessed at,
+    so the audio hears every access instead of only the ones pointed at when it happens to look.
+
+    There's one writer (the playground's thread, with `self.push` and `self.commit`)
+    and one reader (the audio callback, with `self.drain`), and no locks:
+    the writer fills slots first, and only then moves `self.head` past them.
+    Pushed events are only appended to lists, and copied into the buffer all at once when committed,
+    since setting NumPy elements one by one would slow the algorithms down.
+    Its buffer is allocated once, and can be shared memory, so the writer can be in another process.
+
+    The writer never waits for the reader: if the reader falls behind by more than the buffer holds,
+    the oldest events are overwritten, and counted in `self.dropped`.
+    """
+
+    def __init__(self, capacity: int = EVENTS_CAPACITY, buffer=None):
+        if buffer is None:
+            buffer = bytearray(self.size(capacity))
+
+        self.capacity = capacity
+        self.mask = capacity - 1
+        # `capacity` is a power of 2, so slots wrap around with a mask.
+
+        self.head: numpy.ndarray = numpy.ndarray(1, dtype=numpy.int64, buffer=buffer)
+        """How many events were committed (ever). Only written by the writer."""
+        self.nums: numpy.ndarray = numpy.ndarray(capacity, dtype=numpy.int64, buffer=buffer, offset=8)
+        self.times: numpy.ndarray = numpy.ndarray(capacity, dtype=numpy.float64, buffer=buffer, offset=8 + 8 * capacity)
+
+        self.time: float = 0
+        """The time (in `perf_counter` seconds) of the events pushed from now on. Set by the writer."""
+        self.pushed_nums: list[int] = []
+        self.pushed_times: list[float] = []
+        # Pushed by the writer, and not committed yet.
+        self.written: int = 0
+        # Events committed by the writer.
+
+        self.tail: int = 0
+        # Events read by the reader.
+        self.dropped: int = 0
+
+    @staticmethod
+    def size(capacity: int) -> int:
+        """Bytes needed for the buffer of `capacity` events."""
+        return 8 + 16 * capacity
+
+    def push(self, num: int):
+        self.pushed_nums.append(num)
+        self.pushed_times.append(self.time)
+
+    def push_all(self, nums: list[int]):
+        """Pushes `nums`, which were accessed at the same time."""
+        self.pushed_nums += nums
+        self.pushed_times += [self.time] * len(nums)
+
+    def commit(self):
+        """Copies the pushed events into the buffer, and makes them visible to the reader."""
+        nums, times = self.pushed_nums[-self.capacity:], self.pushed_times[-self.capacity:]
+        written = self.written + len(self.pushed_nums)
+        self.pushed_nums = []
+        self.pushed_times = []
+
+        slots = numpy.arange(written - len(nums), written) & self.mask
+        self.nums[slots] = nums
+        self.times[slots] = times
+
+        self.written = written
+        self.head[0] = written
+
+    def drain(self) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Returns the nums and times of the committed events that weren't read yet, oldest first."""
+        head = int(self.head[0])
+
+        start = max(self.tail, head - self.capacity * 3 // 4)
+        # The writer may already be overwriting the oldest slots with the events it's committing.
+        self.dropped += start - self.tail
+        self.tail = head
+
+        slots = numpy.arange(start, head) & self.mask
+        return self.nums[slots], self.times[slots]
+
+    def take(self) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Returns the nums and times of the pushed events, and forgets them, instead of committing them.
+        For a writer that's also the only reader (like `algorithms.sonify`), so nothing is ever dropped.
+        """
+        nums, times = numpy.array(self.pushed_nums, dtype=numpy.int64), numpy.array(self.pushed_times)
+        self.written += len(self.pushed_nums)
+        self.pushed_nums = []
+        self.pushed_times = []
+
+        return nums, times
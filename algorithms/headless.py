@@ -0,0 +1,176 @@
+"""
+Runs algorithms without a UI, as fast as possible.
+
+Run it with `python -m algorithms.headless --help`.
+"""
+from algorithms.playground import SortPlayground, Statistics
+from algorithms.storage import Storage, NumpyStorage, storages
+from algorithms.comparison import Comparator
+from algorithms.trace import TraceRecorder
+from algorithms.algorithm import Algorithm, Option
+from algorithms.inputs import Linear, inputs
+from algorithms.algorithms import Shuffle, Verify, shuffles
+from algorithms.sorts import Concurrent, sorts
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from itertools import chain, islice
+from time import perf_counter
+import argparse
+import sys
+
+STOPPED = object()
+# What `next` returns for a chain of algorithms that ran to the end (their steps yield None).
+
+
+@dataclass
+class Report:
+    """The results of running a chain of algorithms headlessly."""
+    name: str
+    statistics: Statistics
+    steps: int
+    seconds: float
+    finished: bool = True
+    sorted: bool = True
+
+    @property
+    def steps_per_second(self) -> float:
+        return self.steps / self.seconds if self.seconds else float("inf")
+
+    def __str__(self) -> str:
+        if not self.finished:
+            status = "UNFINISHED"
+        elif self.sorted:
+            status = "sorted"
+        else:
+            status = "NOT SORTED"
+
+        return (
+            f"{self.name}: {status}, {self.steps} steps in {self.seconds:.3f}s "
+            f"({self.steps_per_second:,.0f} steps/s), {self.statistics}"
+        )
+
+
+def run(
+    sort_cls,
+    main_array_len: int,
+    input_cls=Linear,
+    shuffle_cls=Shuffle,
+    options: dict[str, Option] | None = None,
+    storage: Storage | None = None,
+    comparator: Comparator | None = None,
+    max_steps: int | None = None,
+    trace: str | None = None,
+    workers: int | None = None,
+) -> Report:
+    """
+    Drains the same chain of algorithms `SortControl.reset` builds
+    (input -> shuffle -> sort -> verify) in a new `SortPlayground`,
+    without any delays, and reports how it went.
+
+    If `max_steps` is given, the run stops after that many steps,
+    and the report is marked as unfinished if it had steps left.
+
+    If `trace` is given, every operation of the run is recorded
+    into a trace file at that path (see `algorithms.trace`).
+
+    If `workers` is given, sorts that can farm work out to other processes (like `RadixMSDSort`)
+    get a pool of that many.
+    """
+    playground = SortPlayground(main_array_len, storage, comparator)
+
+    if trace is not None:
+        playground.start_recording(TraceRecorder(trace))
+
+    sort: Algorithm = sort_cls(playground, options) if options is not None else sort_cls(playground)
+    verify = Verify(playground)
+
+    if isinstance(sort, Concurrent):
+        sort.prepare()
+    # Before the clock starts, instead of the run starting without its compiled network (see `Concurrent.run`).
+
+    pool: ProcessPoolExecutor | None = None
+    if workers is not None and hasattr(sort, "pool"):
+        pool = ProcessPoolExecutor(workers)
+        sort.pool = pool
+        sort.workers = workers
+
+    algorithms = chain(input_cls(playground).run(),
+                       shuffle_cls(playground).run(),
+                       sort.run(),
+                       verify.run())
+
+    steps = 0
+    start = perf_counter()
+    try:
+        for steps, _ in enumerate(islice(algorithms, max_steps), 1):
+            pass
+        seconds = perf_counter() - start
+        statistics = replace(playground.statistics)
+
+        if trace is not None:
+            playground.stop_recording().close()
+
+        finished = steps != max_steps or next(algorithms, STOPPED) is STOPPED
+        # Runs that end in exactly `max_steps` steps are only told from unfinished ones by trying one more step,
+        # which isn't counted, timed, or recorded.
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    return Report(
+        sort_cls.__doc__,
+        statistics,
+        steps,
+        seconds,
+        finished=finished,
+        sorted=verify.sorted,
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    sort_classes = {sort_cls.__doc__: sort_cls for sort_cls in sorts}
+    input_classes = {input_cls.__doc__: input_cls for input_cls in inputs}
+    shuffle_classes = {shuffle_cls.__doc__: shuffle_cls for shuffle_cls in shuffles}
+    storage_classes = {storage_cls.__doc__: storage_cls for storage_cls in storages}
+
+    parser = argparse.ArgumentParser(description="Runs sorts without a UI, as fast as possible.")
+    parser.add_argument("--size", type=int, default=1024)
+    parser.add_argument("--sort", action="append", choices=sort_classes.keys(),
+                        help="Can be given several times. Runs every sort by default.")
+    parser.add_argument("--input", choices=input_classes.keys(), default=Linear.__doc__)
+    parser.add_argument("--shuffle", choices=shuffle_classes.keys(), default=Shuffle.__doc__)
+    parser.add_argument("--storage", choices=storage_classes.keys(), default=NumpyStorage.__doc__)
+    parser.add_argument("--max-steps", type=int, default=None,
+                        help="Stops each run after this many steps.")
+    parser.add_argument("--trace", default=None,
+                        help="Records every operation into this file. Needs exactly one --sort.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processes for the sorts that can use several (like Radix MSD Sort).")
+    args = parser.parse_args(argv)
+
+    if args.trace is not None and len(args.sort or ()) != 1:
+        parser.error("--trace needs exactly one --sort.")
+
+    all_sorted = True
+
+    for name in args.sort or sort_classes.keys():
+        report = run(
+            sort_classes[name],
+            args.size,
+            input_classes[args.input],
+            shuffle_classes[args.shuffle],
+            storage=storage_classes[args.storage](),
+            max_steps=args.max_steps,
+            trace=args.trace,
+            workers=args.workers,
+        )
+        print(report)
+
+        if report.finished and not report.sorted:
+            all_sorted = False
+
+    return 0 if all_sorted else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
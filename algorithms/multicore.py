@@ -0,0 +1,276 @@
+"""
+Sorts big arrays with compiled sorting networks (see `algorithms.networks`) on several cores:
+the array and the network live in `multiprocessing.shared_memory`, and a pool of worker processes
+each do a contiguous slice of every layer, waiting for each other at a barrier between layers.
+
+It only pays off for networks with wide layers (like the bitonic ones, at big sizes),
+with a core for every worker: the odd-even merge networks are mostly layers too narrow to split
+(see `plan_stages`), and with few cores, waiting at the barriers costs more than splitting the layers saves.
+
+Run it with `python -m algorithms.multicore --help` to compare it with `apply_network` (one process).
+"""
+from algorithms.networks import CompiledNetwork, NetworkCache, network_cache, apply_network
+from algorithms.sorts import BatchersBitonicSort, OddEvenMergesort, Concurrent, sorts
+from dataclasses import dataclass
+from multiprocessing import Process, Barrier, Semaphore
+from multiprocessing.connection import wait
+from multiprocessing.shared_memory import SharedMemory
+from multiprocessing.synchronize import Barrier as BarrierType, Semaphore as SemaphoreType
+from threading import BrokenBarrierError
+from time import perf_counter
+import argparse
+import numpy
+import os
+import sys
+
+Stage = tuple[int, int, bool]
+# (first layer, end layer, parallel): a run of layers done by every worker (a barrier after each layer),
+# or by the first worker alone (one barrier after the whole run).
+
+
+def plan_stages(widths: numpy.ndarray, workers: int, min_slice: int) -> list[Stage]:
+    """
+    Splits layers of `widths` comparators into stages: layers wide enough to give every worker
+    at least `min_slice` comparators are done in parallel, and runs of narrower layers by one worker,
+    since waiting at a barrier would take longer than doing them.
+    """
+    stages: list[Stage] = []
+
+    for layer, width in enumerate(widths.tolist()):
+        parallel = width >= workers * min_slice
+
+        if not parallel and stages and not stages[-1][2]:
+            stages[-1] = (stages[-1][0], layer + 1, False)
+        else:
+            stages.append((layer, layer + 1, parallel))
+
+    return stages
+
+
+def apply_slice(array: numpy.ndarray, lows: numpy.ndarray, highs: numpy.ndarray) -> int:
+    """Like one layer of `apply_network`, for some of its comparators."""
+    nums_low, nums_high = array[lows], array[highs]
+    swapped = nums_low > nums_high
+
+    array[lows[swapped]], array[highs[swapped]] = nums_high[swapped], nums_low[swapped]
+    return int(swapped.sum())
+
+
+def run_worker(worker: int, workers: int, block_names: tuple[str, str, str, str], main_array_len: int, dtype: str,
+               bounds: list[int], stages: list[Stage], layer_barrier: BarrierType, ready: SemaphoreType,
+               go: SemaphoreType, timeout: float):
+    """
+    Entry point of each worker process of `apply_network_multicore`.
+    Exits with code 1 if waiting for the others (to start, or at a barrier) takes over `timeout` seconds.
+    """
+    blocks = [SharedMemory(name) for name in block_names]
+
+    try:
+        array_block, lows_block, highs_block, swaps_block = blocks
+        size = bounds[-1]
+
+        array = numpy.ndarray(main_array_len, dtype=dtype, buffer=array_block.buf)
+        lows = numpy.ndarray(size, dtype=numpy.intp, buffer=lows_block.buf)
+        highs = numpy.ndarray(size, dtype=numpy.intp, buffer=highs_block.buf)
+        swaps = numpy.ndarray(workers, dtype=numpy.int64, buffer=swaps_block.buf)
+
+        worker_swaps = 0
+        ready.release()
+        if not go.acquire(timeout=timeout):
+            sys.exit(1)
+        # Every worker is ready, and the clock starts.
+
+        for first_layer, end_layer, parallel in stages:
+            if parallel:
+                for layer in range(first_layer, end_layer):
+                    start, width = bounds[layer], bounds[layer + 1] - bounds[layer]
+                    low, high = start + width * worker // workers, start + width * (worker + 1) // workers
+
+                    worker_swaps += apply_slice(array, lows[low:high], highs[low:high])
+                    layer_barrier.wait(timeout)
+            else:
+                if not worker:
+                    for layer in range(first_layer, end_layer):
+                        start, end = bounds[layer], bounds[layer + 1]
+                        worker_swaps += apply_slice(array, lows[start:end], highs[start:end])
+                layer_barrier.wait(timeout)
+
+        swaps[worker] = worker_swaps
+    except BrokenBarrierError:
+        sys.exit(1)
+    # The parent reports it.
+    finally:
+        array = lows = highs = swaps = None
+        # Blocks can only be closed once no array uses them anymore.
+        for block in blocks:
+            block.close()
+
+
+def check_workers(processes: list[Process]):
+    """Raises `RuntimeError` if a worker exited with an error (or was killed)."""
+    if any(process.exitcode not in (None, 0) for process in processes):
+        exit_codes = ", ".join(f"{worker}: {process.exitcode}" for worker, process in enumerate(processes))
+        raise RuntimeError(f"Workers failed before the network was done (exit codes {exit_codes}).")
+
+
+@dataclass
+class MulticoreResult:
+    swaps: int
+    seconds: float
+    """From when every worker is ready until they've all exited, without starting them or copying in and out of shared memory."""
+    stages: int
+    parallel_layers: int
+
+
+def apply_network_multicore(network: CompiledNetwork, array: numpy.ndarray, workers: int,
+                            min_slice: int = 4096, timeout: float = 600) -> MulticoreResult:
+    """
+    Sorts `array` in place with `network`, like `apply_network`, with `workers` processes.
+    Layers with fewer than `workers * min_slice` comparators are done by a single worker (see `plan_stages`).
+
+    Raises `RuntimeError` as soon as a worker dies, or waits for the others for over `timeout` seconds.
+    """
+    lows, highs = network.layer_lows, network.layer_highs
+    bounds = network.layer_bounds.tolist()
+    stages = plan_stages(network.widths, workers, min_slice)
+
+    blocks = [SharedMemory(create=True, size=max(1, size))
+              for size in (array.nbytes, lows.nbytes, highs.nbytes, 8 * workers)]
+    # Blocks can't be empty.
+    processes: list[Process] = []
+
+    try:
+        shared_array = numpy.ndarray(len(array), dtype=array.dtype, buffer=blocks[0].buf)
+        shared_array[:] = array
+        numpy.ndarray(len(lows), dtype=numpy.intp, buffer=blocks[1].buf)[:] = lows
+        numpy.ndarray(len(highs), dtype=numpy.intp, buffer=blocks[2].buf)[:] = highs
+        swaps = numpy.ndarray(workers, dtype=numpy.int64, buffer=blocks[3].buf)
+
+        layer_barrier = Barrier(workers)
+        ready, go = Semaphore(0), Semaphore(0)
+        # Semaphores instead of a barrier with the parent: a worker killed in the middle of a barrier's wait
+        # can leave it locked for good, and the parent has to notice instead of waiting with the others.
+        block_names = tuple(block.name for block in blocks)
+
+        for worker in range(workers):
+            process = Process(target=run_worker, daemon=True,
+                              args=(worker, workers, block_names, len(array), array.dtype.str,
+                                    bounds, stages, layer_barrier, ready, go, timeout))
+            process.start()
+            processes.append(process)
+
+        deadline = perf_counter() + timeout
+        for _ in processes:
+            while not ready.acquire(timeout=0.1):
+                check_workers(processes)
+                if perf_counter() > deadline:
+                    raise RuntimeError(f"Workers weren't ready after {timeout}s.")
+
+        start = perf_counter()
+        for _ in processes:
+            go.release()
+
+        sentinels = {process.sentinel: process for process in processes}
+        while sentinels:
+            for sentinel in wait(list(sentinels)):
+                sentinels.pop(sentinel).join()
+                # Its sentinel is ready a moment before its exit code is.
+            check_workers(processes)
+        # A worker that hangs makes the others time out at the barrier, and exit with an error.
+        seconds = perf_counter() - start
+
+        array[:] = shared_array
+        result = MulticoreResult(int(swaps.sum()), seconds, len(stages),
+                                 sum(end - first for first, end, parallel in stages if parallel))
+    finally:
+        shared_array = swaps = None
+
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    return result
+
+
+@dataclass
+class MulticoreReport:
+    """How sorting with a network on several cores compares with sorting with it on one."""
+    network: CompiledNetwork
+    workers: int
+    single_seconds: float
+    result: MulticoreResult
+    sorted: bool
+
+    @property
+    def speedup(self) -> float:
+        return self.single_seconds / self.result.seconds if self.result.seconds else float("inf")
+
+    def __str__(self) -> str:
+        network = self.network
+        return (
+            f"{network.name} (n={network.main_array_len}, {network.depth} layers, "
+            f"{self.result.parallel_layers} in parallel): {'sorted' if self.sorted else 'NOT SORTED'}, "
+            f"{self.single_seconds:.3f}s on 1 process, {self.result.seconds:.3f}s on {self.workers} workers "
+            f"({self.speedup:.2f}x)"
+        )
+
+
+def compare_executors(network: CompiledNetwork, workers: int, min_slice: int = 4096) -> MulticoreReport:
+    """Sorts the same shuffled array with `apply_network` and with `apply_network_multicore`, and times both."""
+    nums = numpy.random.permutation(network.main_array_len).astype(numpy.int64) + 1
+
+    single = nums.copy()
+    start = perf_counter()
+    apply_network(network, single)
+    single_seconds = perf_counter() - start
+
+    multiple = nums.copy()
+    result = apply_network_multicore(network, multiple, workers, min_slice)
+
+    is_sorted = bool(numpy.array_equal(single, multiple) and numpy.all(multiple[:-1] <= multiple[1:]))
+    return MulticoreReport(network, workers, single_seconds, result, is_sorted)
+
+
+def main(argv: list[str] | None = None) -> int:
+    network_classes = {sort_cls.__doc__: sort_cls for sort_cls in sorts if issubclass(sort_cls, Concurrent)}
+
+    parser = argparse.ArgumentParser(
+        description="Sorts with the sorting networks on several cores. "
+                    "Expect a speedup only for networks with wide layers (like the bitonic ones) at big sizes, "
+                    "with a core for every worker: the odd-even merge networks are mostly narrow layers "
+                    "that one worker does alone, and on few cores the barriers between layers cost more than they save "
+                    "(4 workers ran at about 0.9x).")
+    parser.add_argument("--size", type=int, default=1 << 16,
+                        help="A power of 2, for most networks. Compiling big networks the first time takes a while.")
+    parser.add_argument("--sort", action="append", choices=network_classes.keys(),
+                        help=f"Can be given several times. Defaults to {BatchersBitonicSort.__doc__} "
+                             f"and {OddEvenMergesort.__doc__}.")
+    parser.add_argument("--workers", type=int, action="append",
+                        help="Can be given several times. Defaults to every core. More workers than cores only slows it down.")
+    parser.add_argument("--min-slice", type=int, default=4096,
+                        help="Layers that would give each worker fewer comparators are done by one worker.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Compiles every network, without reading or writing the cache.")
+    args = parser.parse_args(argv)
+
+    cache = NetworkCache(None) if args.no_cache else network_cache
+    all_sorted = True
+
+    for name in args.sort or [BatchersBitonicSort.__doc__, OddEvenMergesort.__doc__]:
+        network = cache.get(network_classes[name], args.size)
+        print(network)
+
+        for workers in args.workers or [os.cpu_count() or 1]:
+            report = compare_executors(network, workers, args.min_slice)
+            print(f"    {report}")
+            all_sorted &= report.sorted
+
+    return 0 if all_sorted else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+"""
+Sorting networks as data: the comparators a network sort (see `algorithms.sorts.Concurrent`) does
+for some length, compiled once into an array, and grouped into layers of comparators that don't share positions,
+so each layer can be applied all at once (see `SortPlayground.compare_exchange`).
+
+Compiled networks are cached in memory and as `.npy` files (see `NetworkCache`),
+and can be applied straight to a NumPy array with `apply_network`, without a playground.
+
+Run `python -m algorithms.compile_networks --help` for their sizes and depths.
+"""
+from array import array
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from threading import Lock, Thread
+from time import perf_counter
+from typing import Iterator
+import numpy
+import os
+
+Comparator = tuple[int, int]
+# (low, high): afterwards, the num at `low` is at most the num at `high`.
+
+Layer = tuple[numpy.ndarray, numpy.ndarray]
+# (lows, highs) of every comparator in the layer.
+
+COMPARATOR_DTYPE = numpy.dtype([
+    ("layer", numpy.int32),
+    ("i", numpy.int32),
+    ("j", numpy.int32),
+    ("direction", numpy.int8),
+])
+"""
+A compiled comparator: positions `i < j`, and its `direction`
+(1 if it leaves the lesser num at `i`, 0 if it leaves it at `j`), in layer number `layer`.
+"""
+
+NETWORK_CACHE_VERSION = 1
+# Part of the cached files' names, so changing how networks compile doesn't load stale ones.
+
+
+class ComparatorRecorder:
+    """
+    Stands in for the playground of a network sort, to record its comparators instead of doing them.
+
+    Networks compare the same positions whatever the nums are,
+    so every comparison can say the nums are in order, and nothing is ever swapped.
+    """
+
+    def __init__(self, main_array_len: int):
+        self.main_array_len = main_array_len
+        self.lows: array = array("q")
+        self.highs: array = array("q")
+        # The comparators (see `Comparator`), in compact arrays, since big networks have millions of them.
+
+    def compare(self, index_a: tuple[int, int], comparison: str, index_b: tuple[int, int]) -> bool:
+        for index in (index_a, index_b):
+            if not 0 <= index[1] < self.main_array_len:
+                raise IndexError(f"Position {index[1]} is outside an array of length {self.main_array_len}.")
+        # Like the playground would, for networks that only work for some lengths.
+
+        if index_a != index_b:
+            if comparison in (">", ">="):
+                self.lows.append(index_a[1])
+                self.highs.append(index_b[1])
+            else:
+                self.lows.append(index_b[1])
+                self.highs.append(index_a[1])
+        # Swapping when the first num is less leaves the greater one first.
+
+        return False
+
+    def swap(self, index_a: tuple[int, int], index_b: tuple[int, int]):
+        raise RuntimeError("Networks only swap what they compared, and nothing compares out of order here.")
+
+
+@dataclass
+class CompiledNetwork:
+    """
+    The comparators of a network sort for one length, in the order the sort does them,
+    each tagged with its layer: the earliest one after every comparator it shares a position with.
+    Doing the layers in order sorts the same way as doing the comparators in order.
+
+    Layers are only as shallow as the comparators the sort does allow: the bitonic sorts get the 55 layers
+    Batcher's network has for 1024 nums, but the odd-even merge sorts (all three) merge with a chain of
+    neighboring comparators, and the pairwise network with a binary search per num, which share positions
+    one after another, so they get 2081 and 14417 layers instead (see `ParallelOddEvenMergeSort`
+    for Batcher's odd-even merge sort, layer by layer).
+    """
+    name: str
+    main_array_len: int
+    comparators: numpy.ndarray
+    """Of `COMPARATOR_DTYPE`."""
+    compile_seconds: float = 0
+
+    layer_order: numpy.ndarray = field(init=False, repr=False)
+    layer_bounds: numpy.ndarray = field(init=False, repr=False)
+    layer_lows: numpy.ndarray = field(init=False, repr=False)
+    layer_highs: numpy.ndarray = field(init=False, repr=False)
+    # The comparators sorted by layer, where each layer starts and ends in that order,
+    # and their lows and highs in that order, so each layer is just a slice of them.
+
+    def __post_init__(self):
+        layers = self.comparators["layer"]
+
+        self.layer_order = numpy.argsort(layers, kind="stable")
+        self.layer_bounds = numpy.searchsorted(layers[self.layer_order], numpy.arange(self.depth + 1))
+        self.layer_lows, self.layer_highs = self.lows_highs(self.comparators[self.layer_order])
+
+    @classmethod
+    def compile(cls, network_cls, main_array_len: int) -> "CompiledNetwork":
+        """
+        Records the comparators of `network_cls.run_sequentially` for `main_array_len`
+        (see `ComparatorRecorder`), and sorts them into layers.
+        Networks whose `network_cls.network_layers` gives their layers right away are taken as they are.
+        """
+        start = perf_counter()
+
+        layers = network_cls.network_layers(main_array_len)
+        if layers is not None:
+            layers = list(layers)
+            widths = [len(layer_lows) for layer_lows, layer_highs in layers]
+            comparators = numpy.zeros(sum(widths), dtype=COMPARATOR_DTYPE)
+
+            if len(comparators):
+                lows, highs = (numpy.concatenate(positions) for positions in zip(*layers))
+
+                comparators["layer"] = numpy.repeat(numpy.arange(len(layers)), widths)
+                comparators["i"] = numpy.minimum(lows, highs)
+                comparators["j"] = numpy.maximum(lows, highs)
+                comparators["direction"] = lows < highs
+
+            return cls(network_cls.__doc__, main_array_len, comparators, perf_counter() - start)
+
+        recorder = ComparatorRecorder(main_array_len)
+        for _ in network_cls(recorder).run_sequentially():
+            pass
+
+        comparators = numpy.zeros(len(recorder.lows), dtype=COMPARATOR_DTYPE)
+
+        ready = [0] * main_array_len
+        # The first layer each position is free in.
+        layers = array("q")
+        for low, high in zip(recorder.lows, recorder.highs):
+            layer = max(ready[low], ready[high])
+            ready[low] = ready[high] = layer + 1
+            layers.append(layer)
+
+        if len(comparators):
+            lows, highs = numpy.frombuffer(recorder.lows, dtype=numpy.int64), numpy.frombuffer(recorder.highs, dtype=numpy.int64)
+
+            comparators["layer"] = numpy.frombuffer(layers, dtype=numpy.int64)
+            comparators["i"] = numpy.minimum(lows, highs)
+            comparators["j"] = numpy.maximum(lows, highs)
+            comparators["direction"] = lows < highs
+
+        return cls(network_cls.__doc__, main_array_len, comparators, perf_counter() - start)
+
+    @property
+    def size(self) -> int:
+        """How many comparators there are."""
+        return len(self.comparators)
+
+    @property
+    def depth(self) -> int:
+        """How many layers there are."""
+        return int(self.comparators["layer"].max()) + 1 if self.size else 0
+
+    @property
+    def widths(self) -> numpy.ndarray:
+        """How many comparators each layer has."""
+        return numpy.diff(self.layer_bounds)
+
+    def lows_highs(self, comparators: numpy.ndarray) -> Layer:
+        """The positions each of `comparators` leaves the lesser and the greater num at."""
+        direction = comparators["direction"].astype(bool)
+        return (numpy.where(direction, comparators["i"], comparators["j"]).astype(numpy.intp),
+                numpy.where(direction, comparators["j"], comparators["i"]).astype(numpy.intp))
+
+    def layer(self, layer_index: int) -> Layer:
+        start, end = self.layer_bounds[layer_index], self.layer_bounds[layer_index + 1]
+        return self.layer_lows[start:end], self.layer_highs[start:end]
+
+    def layers(self) -> Iterator[Layer]:
+        for layer_index in range(self.depth):
+            yield self.layer(layer_index)
+
+    def __str__(self) -> str:
+        widths = self.widths
+        return (
+            f"{self.name} (n={self.main_array_len}): {self.size} comparators in {self.depth} layers "
+            f"({widths.mean() if len(widths) else 0:.1f} per layer on average, at most {widths.max() if len(widths) else 0}), "
+            f"compiled in {self.compile_seconds:.3f}s"
+        )
+
+
+def default_cache_directory() -> str:
+    return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser(os.path.join("~", ".cache")),
+                        "TkinterSortVisualizer", "networks")
+
+
+class NetworkCache:
+    """
+    Compiled networks by class and length, kept in memory,
+    and saved as `.npy` files in `self.directory` (unless it's None), so later runs don't compile them again.
+    Directories that can't be written to only cost the saving.
+
+    Big networks take a while to compile, so threads that can't wait for them (like `SortControl`'s)
+    can have them compiled in the background with `self.get_in_background`, and check `self.ready` until then.
+    """
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory
+        self.networks: dict[tuple[str, int], CompiledNetwork] = {}
+        self.pending: dict[tuple[str, int], Future] = {}
+        self.lock = Lock()
+        # Guards `self.pending`, which background threads remove their networks from.
+
+        self.hits = 0
+        self.loads = 0
+        self.compiles = 0
+
+    def path(self, network_cls, main_array_len: int) -> str:
+        return os.path.join(self.directory, f"{network_cls.__name__}-{main_array_len}-v{NETWORK_CACHE_VERSION}.npy")
+
+    def key(self, network_cls, main_array_len: int) -> tuple[str, int]:
+        return f"{network_cls.__module__}.{network_cls.__qualname__}", main_array_len
+
+    def ready(self, network_cls, main_array_len: int) -> CompiledNetwork | None:
+        """Returns the network of `network_cls` for `main_array_len` if it's in memory, without loading or compiling it."""
+        return self.networks.get(self.key(network_cls, main_array_len))
+
+    def get(self, network_cls, main_array_len: int) -> CompiledNetwork:
+        """Returns the network of `network_cls` for `main_array_len`, compiling it if it isn't cached anywhere."""
+        key = self.key(network_cls, main_array_len)
+
+        if key in self.networks:
+            self.hits += 1
+            return self.networks[key]
+
+        network = self.load(network_cls, main_array_len)
+
+        if network is None:
+            network = CompiledNetwork.compile(network_cls, main_array_len)
+            self.compiles += 1
+            self.save(network_cls, network)
+        else:
+            self.loads += 1
+
+        self.networks[key] = network
+        return network
+
+    def get_in_background(self, network_cls, main_array_len: int) -> Future:
+        """
+        Starts `self.get` in a new thread, unless it's already running for the same network,
+        and returns a future of the network.
+        """
+        key = self.key(network_cls, main_array_len)
+
+        with self.lock:
+            if key in self.pending:
+                return self.pending[key]
+
+            future = Future()
+            self.pending[key] = future
+
+        def get():
+            try:
+                future.set_result(self.get(network_cls, main_array_len))
+            except Exception as exception:
+                future.set_exception(exception)
+            finally:
+                with self.lock:
+                    del self.pending[key]
+
+        Thread(target=get, daemon=True).start()
+        # A daemon, so closing the app doesn't wait for it.
+        return future
+
+    def load(self, network_cls, main_array_len: int) -> CompiledNetwork | None:
+        if self.directory is None:
+            return None
+
+        try:
+            comparators = numpy.load(self.path(network_cls, main_array_len), allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+
+        if comparators.dtype != COMPARATOR_DTYPE or comparators.ndim != 1:
+            return None
+        # Left over from something else.
+
+        return CompiledNetwork(network_cls.__doc__, main_array_len, comparators)
+
+    def save(self, network_cls, network: CompiledNetwork):
+        if self.directory is None:
+            return
+
+        path = self.path(network_cls, network.main_array_len)
+        temporary_path = f"{path}.{os.getpid()}.tmp.npy"
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            numpy.save(temporary_path, network.comparators, allow_pickle=False)
+            os.replace(temporary_path, path)
+        except OSError:
+            pass
+        # Written aside first, so other processes never load half a file.
+
+    def __str__(self) -> str:
+        return (f"networks: {len(self.networks)} in memory, {self.hits} hits, {self.loads} loaded "
+                f"from {self.directory}, {self.compiles} compiled")
+
+
+network_cache = NetworkCache(default_cache_directory())
+"""The cache the network sorts use."""
+
+
+def apply_network(network: CompiledNetwork, array: numpy.ndarray) -> int:
+    """
+    Sorts `array` in place with `network` (of its length), a whole layer at a time,
+    with nothing but NumPy. Returns how many swaps it made.
+    """
+    swaps = 0
+
+    for lows, highs in network.layers():
+        nums_low, nums_high = array[lows], array[highs]
+        swapped = nums_low > nums_high
+
+        array[lows[swapped]], array[highs[swapped]] = nums_high[swapped], nums_low[swapped]
+        swaps += int(swapped.sum())
+
+    return swaps
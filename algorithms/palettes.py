@@ -0,0 +1,104 @@
+from dataclasses import dataclass, field
+import numpy
+
+
+@dataclass
+class ColorTable:
+    """
+    The colors of every num in `range(max_num + 1)` for one palette,
+    as RGB rows (`self.rgb`, for framebuffers) and as Tk color strings
+    (`self.hex`, for canvas items).
+    """
+    max_num: int
+    rgb: numpy.ndarray
+    hex_colors: list[str] | None = field(default=None, repr=False)
+
+    @property
+    def hex(self) -> list[str]:
+        if self.hex_colors is None:
+            self.hex_colors = ['#%02x%02x%02x' % tuple(color) for color in self.rgb.tolist()]
+        # Only canvas items need strings, so they're only made the first time they're asked for.
+        return self.hex_colors
+
+    def rgb_colors(self, nums: numpy.ndarray) -> numpy.ndarray:
+        """Returns the RGB color of each of `nums`, clipping nums outside the table to its ends."""
+        return self.rgb[numpy.clip(nums, 0, self.max_num)]
+
+    def hex_color(self, num: int) -> str:
+        """Returns the Tk color string of `num`, clipping nums outside the table to its ends."""
+        return self.hex[min(max(num, 0), self.max_num)]
+
+
+class Palette:
+    """
+    Maps nums to colors, by precomputing a `ColorTable` with the color
+    of every num up to `max_num` all at once.
+
+    The last table is kept, so it's only computed again
+    when `max_num` (the length of the main array) changes.
+    """
+
+    def __init__(self):
+        self.cached_table: ColorTable | None = None
+
+    def colors(self, hues: numpy.ndarray) -> numpy.ndarray:
+        """Returns the RGB colors (between 0 and 1) of `hues`, which go from 0 to 1."""
+        raise NotImplementedError("Palette is abstract.")
+
+    def table(self, max_num: int) -> ColorTable:
+        """Returns the (cached) `ColorTable` of every num in `range(max_num + 1)`."""
+        if self.cached_table is None or self.cached_table.max_num != max_num:
+            hues = numpy.arange(max_num + 1) / max_num if max_num else numpy.zeros(1)
+            rgb = (self.colors(hues) * 255).astype(numpy.uint8)
+
+            self.cached_table = ColorTable(max_num, rgb)
+
+        return self.cached_table
+
+
+class RainbowPalette(Palette):
+    """Rainbow"""
+    def colors(self, hues: numpy.ndarray) -> numpy.ndarray:
+        sectors = hues * 6
+        sector_indices = numpy.floor(sectors).astype(int) % 6
+        rising = sectors - numpy.floor(sectors)
+        falling = 1 - rising
+        full = numpy.ones_like(rising)
+        empty = numpy.zeros_like(rising)
+        # Same as `colorsys.hsv_to_rgb` with full saturation and value.
+
+        r = numpy.choose(sector_indices, [full, falling, empty, empty, rising, full])
+        g = numpy.choose(sector_indices, [rising, full, full, falling, empty, empty])
+        b = numpy.choose(sector_indices, [empty, empty, rising, full, full, falling])
+
+        return numpy.stack((r, g, b), axis=1)
+
+
+class GrayscalePalette(Palette):
+    """Grayscale"""
+    def colors(self, hues: numpy.ndarray) -> numpy.ndarray:
+        levels = 0.75 * hues
+        # From black to light gray, so the biggest nums still stand out on light backgrounds.
+
+        return numpy.stack((levels, levels, levels), axis=1)
+
+
+class HighContrastPalette(Palette):
+    """High Contrast"""
+    stops = numpy.array([
+        (0.00, 0.05, 0.03, 0.53),
+        (0.25, 0.49, 0.01, 0.66),
+        (0.50, 0.80, 0.28, 0.47),
+        (0.75, 0.97, 0.58, 0.25),
+        (1.00, 0.94, 0.98, 0.13),
+    ])
+    # (hue, r, g, b): dark blue to yellow through purple and orange,
+    # getting brighter the whole way, so neighbouring nums differ in brightness as well as hue.
+
+    def colors(self, hues: numpy.ndarray) -> numpy.ndarray:
+        positions = self.stops[:, 0]
+
+        return numpy.stack([numpy.interp(hues, positions, self.stops[:, channel]) for channel in (1, 2, 3)], axis=1)
+
+
+palettes = [RainbowPalette, GrayscalePalette, HighContrastPalette]
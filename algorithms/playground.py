@@ -1,4 +1,10 @@
 from dataclasses import dataclass
+from algorithms.storage import Storage, NumpyStorage
+from algorithms.comparison import Comparator
+from algorithms.dirty import DirtyTracker, DirtyReader
+from algorithms.events import AccessEvents
+import numpy
+from algorithms.trace import TraceRecorder, RECORD_DTYPE, OP_READ, OP_WRITE, OP_INCREMENT, OP_SWAP, OP_COMPARE, OP_SPAWN, OP_DELETE, OP_ITER, OP_RESET
 
 Pointer = tuple[int, int]
 PointerType = int
@@ -7,6 +13,63 @@ READ: PointerType = 0
 WRITE: PointerType = 1
 
 
+class AccessRegister:
+    """
+    The positions in the arrays accessed by the latest operation
+    of a `SortPlayground`, and how they were accessed (`READ` or `WRITE`).
+
+    Its slots are allocated once, and each operation overwrites them in place,
+    instead of allocating a new dict of pointers for every operation.
+    Only the first `self.count` slots belong to the latest operation.
+    Operations that access more positions than there are slots (like `SortPlayground.compare_exchange`)
+    add slots, which are kept for the next ones.
+    """
+    __slots__ = ("positions", "kinds", "count")
+
+    def __init__(self, slots: int = 2):
+        self.positions: list[Pointer | None] = [None] * slots
+        self.kinds: list[PointerType] = [READ] * slots
+        self.count: int = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def items(self):
+        """Yields each position accessed by the latest operation, and how it was accessed."""
+        for slot in range(self.count):
+            yield self.positions[slot], self.kinds[slot]
+
+    def clear(self):
+        self.count = 0
+
+    def reserve(self, slots: int):
+        """Adds slots until there are at least `slots`."""
+        missing = slots - len(self.positions)
+
+        if missing > 0:
+            self.positions.extend([None] * missing)
+            self.kinds.extend([READ] * missing)
+
+    def assign(self, pointers: dict[Pointer, PointerType]):
+        """Makes `pointers` the positions accessed by the latest operation."""
+        self.reserve(len(pointers))
+
+        for slot, (position, kind) in enumerate(pointers.items()):
+            self.positions[slot] = position
+            self.kinds[slot] = kind
+
+        self.count = len(pointers)
+
+    def assign_all(self, positions: list[Pointer], kinds: list[PointerType]):
+        """Makes `positions` (accessed as `kinds`) the positions accessed by the latest operation, all at once."""
+        count = len(positions)
+        self.reserve(count)
+
+        self.positions[:count] = positions
+        self.kinds[:count] = kinds
+        self.count = count
+
+
 @dataclass
 class Statistics:
     swaps: int = 0
@@ -35,11 +98,28 @@ class SortPlayground:
     IF AN ALGORITHM DOES OPERATIONS MANUALLY,
     THE STATISTICS ARE NOT COUNTED, AND NEED TO BE COUNTED
     MANUALLY, AS WELL.
+
+    The arrays themselves are built by `self.storage`.
+    By default, they are typed NumPy buffers (see `algorithms.storage`).
+
+    Comparisons are done by `self.comparator`, which can be given
+    a custom key/cmp function for custom orderings (see `algorithms.comparison`).
+
+    Every operation can optionally be recorded into a binary trace,
+    by calling `self.start_recording` (see `algorithms.trace`).
+
+    Consumers that only care about what changed (like renderers)
+    can get a `DirtyReader` from `self.dirty_reader` (see `algorithms.dirty`).
+
+    The nums of every access can be pushed into `self.events`,
+    for consumers that follow every access (like the audio, see `algorithms.events`).
     """
 
-    def __init__(self, main_array_len: int):
-        self.arrays = [list(range(1, main_array_len + 1))]
-        self.pointers: dict[Pointer, PointerType] = {}
+    def __init__(self, main_array_len: int, storage: Storage | None = None, comparator: Comparator | None = None):
+        self.storage: Storage = storage if storage is not None else NumpyStorage()
+        self.comparator: Comparator = comparator if comparator is not None else Comparator()
+        self.arrays = [self.storage.linear(main_array_len)]
+        self.pointers: AccessRegister = AccessRegister()
 
         self.named_pointers: dict[str, Pointer] = {}
         """
@@ -49,6 +129,15 @@ class SortPlayground:
 
         self.statistics: Statistics = Statistics()
 
+        self.recorder: TraceRecorder | None = None
+        """Records every operation while it's not None."""
+
+        self.dirty: DirtyTracker | None = None
+        """Tracks the written positions while it's not None."""
+
+        self.events: AccessEvents | None = None
+        """Gets the nums of every access pushed into it while it's not None."""
+
     @property
     def main_array(self):
         return self.arrays[0]
@@ -63,14 +152,58 @@ class SortPlayground:
 
     def read_at_pointers(self):
         """Yields every num pointed to by self.pointers."""
-        for pointer in self.pointers:
+        pointers = self.pointers
+        positions = pointers.positions
+        seen = set()
+
+        for slot in range(pointers.count):
+            pointer = positions[slot]
+
+            if pointer in seen:
+                continue
+            seen.add(pointer)
+            # An operation can access the same position twice (like swapping a num with itself).
+
             yield self.arrays[pointer[0]][pointer[1]]
     # Meant to be used as a display method.
 
+    def start_recording(self, recorder: TraceRecorder):
+        """
+        Makes `recorder` record every operation from now on,
+        starting with the current contents of every array.
+        """
+        self.recorder = recorder
+
+        for array_index, array in enumerate(self.arrays):
+            self.recorder.load(array_index, array)
+
+    def stop_recording(self) -> TraceRecorder | None:
+        """Stops recording, and returns the recorder (if there was one), already flushed."""
+        recorder = self.recorder
+        self.recorder = None
+
+        if recorder is not None:
+            recorder.flush()
+
+        return recorder
+
+    def dirty_reader(self) -> DirtyReader:
+        """Starts tracking written positions (if it wasn't already), and returns a new reader for them."""
+        if self.dirty is None:
+            self.dirty = DirtyTracker(self.arrays)
+
+        return self.dirty.reader()
+
     def reset(self):
         """Resets counters, deletes extra arrays and all pointers."""
+        if self.recorder is not None:
+            self.recorder.record(OP_RESET, 0, 0)
+
         self.arrays = self.arrays[:1]
-        self.pointers = {}
+        self.pointers.clear()
+
+        if self.dirty is not None:
+            self.dirty.relayout(self.arrays)
 
         self.statistics = Statistics()
 
@@ -81,7 +214,21 @@ class SortPlayground:
 
         Then, calls `self.reset()`.
         """
-        self.arrays[0] = list(range(1, new_len + 1))
+        self.arrays[0] = self.storage.linear(new_len)
+        self.reset()
+
+        if self.recorder is not None:
+            self.recorder.load(0, self.arrays[0])
+
+    def change_storage(self, storage: Storage):
+        """
+        Makes `storage` build the arrays from now on,
+        and converts the main array to it.
+
+        Then, calls `self.reset()`.
+        """
+        self.storage = storage
+        self.arrays[0] = self.storage.convert(self.arrays[0])
         self.reset()
 
     def spawn_new_array(self, size: int):
@@ -91,9 +238,15 @@ class SortPlayground:
 
         Increments the "array spawns" statistic by 1.
         """
-        self.arrays.append([0 for _ in range(size)])
+        self.arrays.append(self.storage.zeros(size))
         self.statistics.array_spawns += 1
 
+        if self.dirty is not None:
+            self.dirty.relayout(self.arrays)
+
+        if self.recorder is not None:
+            self.recorder.record(OP_SPAWN, self.array_count - 1, 0, value=size)
+
     def copy_array(self, input_array_index: int, output_array_index: int):
         for index in range(len(self.arrays[input_array_index])):
             num = self.read((input_array_index, index))
@@ -121,49 +274,240 @@ class SortPlayground:
             yield
 
     def delete_array(self, index: int):
+        if self.recorder is not None:
+            self.recorder.record(OP_DELETE, index % self.array_count, 0)
+            # `index` may be negative.
+
         self.arrays.pop(index)
         self.statistics.array_deletions += 1
 
+        if self.dirty is not None:
+            self.dirty.relayout(self.arrays)
+
     def read(self, index: tuple[int, int]):
         """Returns num at array_index[0], position index[1]."""
-        self.pointers = {index: READ}
+        pointers = self.pointers
+        pointers.positions[0] = index
+        pointers.kinds[0] = READ
+        pointers.count = 1
+        # Setting the slots directly, without method calls, is what makes this cheap.
+
         self.statistics.reads += 1
 
-        return self.arrays[index[0]][index[1]]
+        num = self.arrays[index[0]][index[1]]
+
+        if self.events is not None:
+            self.events.push(num)
+
+        if self.recorder is not None:
+            self.recorder.record(OP_READ, index[0], index[1], value=num)
+
+        return num
 
     def write(self, num: int, index: tuple[int, int]):
         """Writes num at array_index[0], position index[1]."""
-        self.pointers = {index: WRITE}
+        pointers = self.pointers
+        pointers.positions[0] = index
+        pointers.kinds[0] = WRITE
+        pointers.count = 1
+
         self.arrays[index[0]][index[1]] = num
 
         self.statistics.writes += 1
 
+        if self.dirty is not None:
+            self.dirty.mark(index[0], index[1])
+
+        if self.events is not None:
+            self.events.push(num)
+
+        if self.recorder is not None:
+            self.recorder.record(OP_WRITE, index[0], index[1], value=num)
+
+    def write_slice(self, nums: list[int], index: tuple[int, int]):
+        """
+        Writes nums into the array at index[0], from position index[1] on, all at once,
+        counting a write for each, and points at all of them.
+        """
+        array_index, start = index
+        end = start + len(nums)
+
+        self.arrays[array_index][start:end] = nums
+
+        self.statistics.writes += len(nums)
+        self.pointers.assign_all([(array_index, num_index) for num_index in range(start, end)], [WRITE] * len(nums))
+
+        if self.dirty is not None:
+            self.dirty.mark_slice(array_index, start, end)
+
+        if self.events is not None:
+            self.events.push_all(list(nums))
+
+        if self.recorder is not None:
+            records = numpy.zeros(len(nums), dtype=RECORD_DTYPE)
+            records["opcode"] = OP_WRITE
+            records["array"] = array_index
+            records["index"] = numpy.arange(start, end)
+            records["value"] = nums
+            self.recorder.record_all(records)
+
     def increment(self, num: int, index: tuple[int, int]):
         """Increments num at array_index[0], position index[1]."""
-        self.pointers = {index: WRITE}
+        pointers = self.pointers
+        pointers.positions[0] = index
+        pointers.kinds[0] = WRITE
+        pointers.count = 1
+
         self.arrays[index[0]][index[1]] += num
 
         self.statistics.writes += 1
 
+        if self.dirty is not None:
+            self.dirty.mark(index[0], index[1])
+
+        if self.events is not None:
+            self.events.push(self.arrays[index[0]][index[1]])
+
+        if self.recorder is not None:
+            self.recorder.record(OP_INCREMENT, index[0], index[1], value=num)
+
     def array_iter(self, array_index: int):
         """Yields nums at array_index."""
+        pointers = self.pointers
+
         for index, num in enumerate(self.arrays[array_index]):
-            self.pointers = {(array_index, index): READ}
+            pointers.positions[0] = (array_index, index)
+            pointers.kinds[0] = READ
+            pointers.count = 1
+
+            if self.events is not None:
+                self.events.push(num)
+
+            if self.recorder is not None:
+                self.recorder.record(OP_ITER, array_index, index, value=num)
+
             yield num
 
     def compare(self, index_a: tuple[int, int], comparison: str, index_b: tuple[int, int]):
         """Compares nums at index_a and index_b and increases comparisons counter."""
-        self.pointers = {index_a: READ, index_b: READ}
+        pointers = self.pointers
+        pointers.positions[0] = index_a
+        pointers.positions[1] = index_b
+        pointers.kinds[0] = READ
+        pointers.kinds[1] = READ
+        pointers.count = 2
+
         self.statistics.reads += 2
         self.statistics.comparisons += 1
 
-        return eval(f"{self.arrays[index_a[0]][index_a[1]]}{comparison}{self.arrays[index_b[0]][index_b[1]]}")
+        num_a = self.arrays[index_a[0]][index_a[1]]
+        num_b = self.arrays[index_b[0]][index_b[1]]
+        result = self.comparator.resolve(comparison)(num_a, num_b)
+
+        if self.events is not None:
+            self.events.push(num_a)
+            self.events.push(num_b)
+
+        if self.recorder is not None:
+            self.recorder.record(OP_COMPARE, index_a[0], index_a[1], index_b[0], index_b[1], bool(result))
+
+        return result
+
+    def compare_exchange(self, lows: numpy.ndarray, highs: numpy.ndarray, array_index: int = 0) -> int:
+        """
+        Compares the num at each of `lows` with the num at the same position of `highs`
+        (indices in the array at `array_index`), and swaps the pairs where the first is greater,
+        all at once, like a layer of comparators in a sorting network.
+        The pairs must not share positions.
+
+        Counts and records one comparison per pair and one swap per swapped pair,
+        and points at every pair: the swapped ones as `WRITE`, the others as `READ`.
+        Returns the number of swapped pairs.
+        """
+        array = self.arrays[array_index]
+        lows = numpy.asarray(lows, dtype=numpy.intp)
+        highs = numpy.asarray(highs, dtype=numpy.intp)
+
+        if isinstance(array, numpy.ndarray):
+            nums_low, nums_high = array[lows], array[highs]
+        else:
+            nums_low = numpy.array(list(map(array.__getitem__, lows.tolist())), dtype=object)
+            nums_high = numpy.array(list(map(array.__getitem__, highs.tolist())), dtype=object)
+        # Object arrays keep the nums as they are (like Python ints bigger than 64 bits).
+
+        swapped = numpy.asarray(self.comparator.compare_arrays(">", nums_low, nums_high), dtype=bool)
+        swapped_lows, swapped_highs = lows[swapped], highs[swapped]
+        swaps = len(swapped_lows)
+
+        if isinstance(array, numpy.ndarray):
+            array[swapped_lows], array[swapped_highs] = nums_high[swapped], nums_low[swapped]
+        else:
+            for low, high, num_low, num_high in zip(swapped_lows.tolist(), swapped_highs.tolist(),
+                                                    nums_low[swapped].tolist(), nums_high[swapped].tolist()):
+                array[low], array[high] = num_high, num_low
+
+        statistics = self.statistics
+        statistics.comparisons += len(lows)
+        statistics.reads += 2 * len(lows) + 2 * swaps
+        statistics.swaps += swaps
+        statistics.writes += 2 * swaps
+        # The same as comparing each pair with `self.compare`, then swapping with `self.swap`.
+
+        kinds = numpy.where(swapped, WRITE, READ).tolist()
+        self.pointers.assign_all(
+            [(array_index, index) for index in numpy.stack((lows, highs), axis=1).ravel().tolist()],
+            [kind for kind in kinds for _ in range(2)],
+        )
+
+        if self.dirty is not None:
+            self.dirty.mark_all(array_index, swapped_lows)
+            self.dirty.mark_all(array_index, swapped_highs)
+
+        if self.events is not None:
+            self.events.push_all(nums_low.tolist())
+            self.events.push_all(nums_high.tolist())
+            self.events.push_all(nums_high[swapped].tolist())
+            self.events.push_all(nums_low[swapped].tolist())
+        # The nums of every comparison, then the nums after every swap.
+
+        if self.recorder is not None:
+            records = numpy.zeros(len(lows) + swaps, dtype=RECORD_DTYPE)
+            records["array"] = array_index
+            records["other_array"] = array_index
+            records["opcode"][:len(lows)] = OP_COMPARE
+            records["index"][:len(lows)] = lows
+            records["other_index"][:len(lows)] = highs
+            records["value"][:len(lows)] = swapped
+            records["opcode"][len(lows):] = OP_SWAP
+            records["index"][len(lows):] = swapped_lows
+            records["other_index"][len(lows):] = swapped_highs
+            self.recorder.record_all(records)
+        # Every comparison, then every swap: the pairs don't share positions, so the order doesn't change anything.
+
+        return swaps
 
     def swap(self, index_a: tuple[int, int], index_b: tuple[int, int]):
         """Swaps nums at index_a and index_b and increases swaps counter."""
-        self.pointers = {index_a: WRITE, index_b: WRITE}
+        pointers = self.pointers
+        pointers.positions[0] = index_a
+        pointers.positions[1] = index_b
+        pointers.kinds[0] = WRITE
+        pointers.kinds[1] = WRITE
+        pointers.count = 2
+
         self.arrays[index_a[0]][index_a[1]], self.arrays[index_b[0]][index_b[1]] = \
             self.arrays[index_b[0]][index_b[1]], self.arrays[index_a[0]][index_a[1]]
         self.statistics.swaps += 1
         self.statistics.reads += 2
         self.statistics.writes += 2
+
+        if self.dirty is not None:
+            self.dirty.mark(index_a[0], index_a[1])
+            self.dirty.mark(index_b[0], index_b[1])
+
+        if self.events is not None:
+            self.events.push(self.arrays[index_a[0]][index_a[1]])
+            self.events.push(self.arrays[index_b[0]][index_b[1]])
+
+        if self.recorder is not None:
+            self.recorder.record(OP_SWAP, index_a[0], index_a[1], index_b[0], index_b[1])
@@ -0,0 +1,185 @@
+from algorithms.playground import SortPlayground, Statistics, Pointer, PointerType, READ, WRITE
+from algorithms.trace import (OP_READ, OP_WRITE, OP_INCREMENT, OP_SWAP, OP_COMPARE,
+                              OP_SPAWN, OP_DELETE, OP_LOAD, OP_LOAD_ARRAY, OP_ITER, OP_RESET)
+from bisect import bisect_right
+from dataclasses import dataclass, replace
+import numpy
+
+
+@dataclass
+class Keyframe:
+    """A full copy of the arrays and statistics of a replay at some step."""
+    step: int
+    arrays: list[numpy.ndarray]
+    statistics: Statistics
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.arrays)
+
+
+def apply_records(arrays: list[numpy.ndarray], statistics: Statistics, records: numpy.ndarray):
+    """
+    Re-does the operations in `records` (see `algorithms.trace`) on `arrays`,
+    counting them in `statistics` like `SortPlayground` would.
+    """
+    for opcode, array_index, index, other_array_index, other_index, value in records.tolist():
+        if opcode == OP_READ:
+            statistics.reads += 1
+        elif opcode == OP_COMPARE:
+            statistics.reads += 2
+            statistics.comparisons += 1
+        elif opcode == OP_SWAP:
+            array_a, array_b = arrays[array_index], arrays[other_array_index]
+            array_a[index], array_b[other_index] = array_b[other_index], array_a[index]
+            statistics.swaps += 1
+            statistics.reads += 2
+            statistics.writes += 2
+        elif opcode == OP_WRITE:
+            arrays[array_index][index] = value
+            statistics.writes += 1
+        elif opcode == OP_INCREMENT:
+            arrays[array_index][index] += value
+            statistics.writes += 1
+        elif opcode == OP_LOAD:
+            arrays[array_index][index] = value
+        elif opcode == OP_SPAWN:
+            arrays.append(numpy.zeros(value, dtype=numpy.int64))
+            statistics.array_spawns += 1
+        elif opcode == OP_DELETE:
+            arrays.pop(array_index)
+            statistics.array_deletions += 1
+        elif opcode == OP_LOAD_ARRAY:
+            if array_index < len(arrays):
+                arrays[array_index] = numpy.zeros(value, dtype=numpy.int64)
+            else:
+                arrays.append(numpy.zeros(value, dtype=numpy.int64))
+        elif opcode == OP_RESET:
+            del arrays[1:]
+            statistics.__dict__.update(vars(Statistics()))
+
+
+def record_pointers(record) -> dict[Pointer, PointerType] | None:
+    """
+    The pointers `SortPlayground` would have right after doing `record`'s operation,
+    or None if the operation doesn't change them.
+    """
+    opcode, array_index, index, other_array_index, other_index, _ = record.item()
+
+    if opcode in (OP_READ, OP_ITER):
+        return {(array_index, index): READ}
+    if opcode == OP_COMPARE:
+        return {(array_index, index): READ, (other_array_index, other_index): READ}
+    if opcode in (OP_WRITE, OP_INCREMENT):
+        return {(array_index, index): WRITE}
+    if opcode == OP_SWAP:
+        return {(array_index, index): WRITE, (other_array_index, other_index): WRITE}
+    if opcode in (OP_LOAD, OP_LOAD_ARRAY, OP_RESET):
+        return {}
+    return None
+
+
+class Replay(SortPlayground):
+    """
+    A recorded run (see `algorithms.trace`) that can jump to any of its steps.
+    Step `n` is the state of the playground after its first `n` records.
+
+    Every `keyframe_interval` records, a full copy of the arrays (a `Keyframe`) is kept,
+    so seeking only has to re-do the records after the closest keyframe:
+    O(keyframe_interval) instead of O(step).
+
+    Keyframes take at most about `max_keyframe_bytes`: once they'd take more,
+    every other one is dropped, and the interval doubles, so long runs seek slower instead of filling the memory.
+
+    Since it's a `SortPlayground`, anything that displays one
+    can display a replay as well. Its arrays and pointers are the ones at `self.step`.
+    """
+
+    def __init__(self, records: numpy.ndarray, keyframe_interval: int = 4096, max_keyframe_bytes: int = 1 << 28):
+        SortPlayground.__init__(self, 0)
+        self.arrays = []
+
+        self.keyframe_interval = keyframe_interval
+        self.max_keyframe_bytes = max_keyframe_bytes
+        self.keyframes: list[Keyframe] = [Keyframe(0, [], Statistics())]
+        self.keyframe_steps: list[int] = [0]
+        self.keyframe_bytes: int = 0
+
+        self.records: numpy.ndarray = records[:0]
+        self.step: int = 0
+
+        self.built_arrays: list[numpy.ndarray] = []
+        self.built_statistics: Statistics = Statistics()
+        # The state after all of `self.records`, to keep building keyframes from.
+
+        self.update(records)
+
+        self.first_step: int = 0
+        """The step after the arrays were loaded, where the recorded algorithms start."""
+        for opcode in records["opcode"].tolist():
+            if opcode not in (OP_LOAD_ARRAY, OP_LOAD, OP_RESET):
+                break
+            self.first_step += 1
+
+        self.seek(self.first_step)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def update(self, records: numpy.ndarray):
+        """
+        Replaces `self.records` with `records`, which should be the same recording,
+        but longer, and builds the keyframes for the new records.
+        """
+        built = len(self.records)
+        self.records = records
+
+        while built < len(self.records):
+            next_keyframe_step = self.keyframe_steps[-1] + self.keyframe_interval
+
+            apply_records(self.built_arrays, self.built_statistics, self.records[built:next_keyframe_step])
+            built = min(next_keyframe_step, len(self.records))
+
+            if built == next_keyframe_step:
+                keyframe = Keyframe(built, [array.copy() for array in self.built_arrays], replace(self.built_statistics))
+                self.keyframes.append(keyframe)
+                self.keyframe_steps.append(built)
+                self.keyframe_bytes += keyframe.nbytes
+
+                while self.keyframe_bytes > self.max_keyframe_bytes and len(self.keyframes) > 2:
+                    self.thin_keyframes()
+
+    def thin_keyframes(self):
+        """Drops every other keyframe (but the first), and doubles the interval between them."""
+        self.keyframes = self.keyframes[::2]
+        self.keyframe_steps = [keyframe.step for keyframe in self.keyframes]
+        self.keyframe_bytes = sum(keyframe.nbytes for keyframe in self.keyframes)
+        self.keyframe_interval *= 2
+
+    def seek(self, step: int):
+        """Makes the arrays, statistics and pointers the ones at `step`."""
+        step = max(0, min(step, len(self.records)))
+
+        if not (self.step <= step <= self.step + self.keyframe_interval):
+            keyframe = self.keyframes[bisect_right(self.keyframe_steps, step) - 1]
+
+            self.arrays = [array.copy() for array in keyframe.arrays]
+            self.statistics = replace(keyframe.statistics)
+            self.step = keyframe.step
+        # Going a few steps forward is faster than going back to a keyframe.
+
+        apply_records(self.arrays, self.statistics, self.records[self.step:step])
+        self.step = step
+
+        if self.dirty is not None:
+            self.dirty.relayout(self.arrays)
+        # Records are re-done on the arrays directly, so any of their positions could have changed.
+
+        self.pointers.clear()
+        for record_index in range(step - 1, -1, -1):
+            pointers = record_pointers(self.records[record_index])
+
+            if pointers is not None:
+                self.pointers.assign(pointers)
+                break
+        # Spawning and deleting arrays keeps the pointers of the previous operation.
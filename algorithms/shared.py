@@ -0,0 +1,290 @@
+"""
+Playgrounds whose arrays live in `multiprocessing.shared_memory`,
+so a playground running in one process can be read by another without copying.
+
+The process running the algorithms builds its arrays with `SharedMemoryStorage`,
+tracks its writes with a `SharedDirtyTracker`, and calls `write_header`
+after each batch of steps. The reading process keeps a `SharedPlayground`
+up to date with `SharedPlayground.apply_layout` and `SharedPlayground.apply_header`.
+"""
+from algorithms.storage import Storage
+from algorithms.playground import SortPlayground, Statistics, Pointer
+from algorithms.dirty import DirtyTracker, block_count, written_since
+from dataclasses import fields
+from multiprocessing.shared_memory import SharedMemory
+from threading import Lock
+from typing import Iterable, Sized
+import numpy
+
+STATISTICS_FIELDS: list[str] = [statistic.name for statistic in fields(Statistics)]
+
+REGISTER_SLOTS = 1024
+"""
+How many pointers a header can hold. A `SortPlayground`'s `AccessRegister` grows as needed,
+but the header has a fixed size, so operations that access more positions
+(like `SortPlayground.compare_exchange` on a layer of a big sorting network) only show their first ones.
+"""
+
+HEADER_DTYPE = numpy.dtype([
+    ("sequence", numpy.int64),
+    ("epoch", numpy.int64),
+    ("layout_epoch", numpy.int64),
+    ("register_count", numpy.int64),
+    ("register_positions", numpy.int64, (REGISTER_SLOTS, 2)),
+    ("register_kinds", numpy.int64, (REGISTER_SLOTS,)),
+    ("statistics", numpy.int64, (len(STATISTICS_FIELDS),)),
+    ("playing", numpy.int64),
+    ("finished", numpy.int64),
+    ("recorded_steps", numpy.int64),
+    ("speed", numpy.float64),
+])
+"""
+The state of a playground (besides its arrays) as a single record in shared memory.
+`sequence` is odd while the record is being written (see `write_header` and `read_header`).
+`recorded_steps` is -1 while the playground isn't recording.
+"""
+
+ArrayLayout = tuple[str, int, str, str, str]
+"""(block name of the array, length, dtype, block name of its dirty stamps, block name of its dirty block stamps)"""
+
+
+class SharedArray(numpy.ndarray):
+    """A NumPy array whose buffer is the shared memory block named `self.block_name`."""
+    block_name: str = ""
+
+
+def shared_array(block: SharedMemory, size: int, dtype) -> SharedArray:
+    array = numpy.ndarray(size, dtype=dtype, buffer=block.buf).view(SharedArray)
+    array.block_name = block.name
+    return array
+
+
+class SharedMemoryStorage(Storage):
+    """Shared Memory"""
+    # Every array gets its own shared memory block, owned by this storage.
+    # Blocks of arrays that aren't used anymore are unlinked by `self.release`.
+
+    def __init__(self, dtype=numpy.int64):
+        self.dtype = numpy.dtype(dtype)
+        self.blocks: dict[str, SharedMemory] = {}
+        self.retired: list[SharedMemory] = []
+        # Unlinked, but still mapped by arrays someone holds on to.
+
+    def zeros(self, size: int) -> SharedArray:
+        block = SharedMemory(create=True, size=max(1, size * self.dtype.itemsize))
+        # Blocks can't be empty.
+        self.blocks[block.name] = block
+
+        array = shared_array(block, size, self.dtype)
+        array[:] = 0
+        return array
+
+    def linear(self, size: int) -> SharedArray:
+        array = self.zeros(size)
+        array[:] = numpy.arange(1, size + 1)
+        return array
+
+    def convert(self, nums: Iterable[int]) -> SharedArray:
+        nums = numpy.fromiter(nums, dtype=self.dtype)
+
+        array = self.zeros(len(nums))
+        array[:] = nums
+        return array
+
+    def release(self, arrays: Iterable[SharedArray]):
+        """Unlinks the blocks of every array built by this storage, except `arrays`."""
+        used_names = {array.block_name for array in arrays}
+
+        for name in self.blocks.keys() - used_names:
+            block = self.blocks.pop(name)
+            block.unlink()
+            self.retired.append(block)
+
+        self.close_retired()
+
+    def close_retired(self):
+        retired = self.retired
+        self.retired = []
+
+        for block in retired:
+            try:
+                block.close()
+            except BufferError:
+                self.retired.append(block)
+        # Blocks can only be closed once no array uses them anymore.
+
+    def close(self):
+        """Unlinks every block."""
+        self.release(())
+
+
+class SharedDirtyTracker(DirtyTracker):
+    """A `DirtyTracker` whose stamps are built by a `SharedMemoryStorage`, so another process can read them."""
+
+    def __init__(self, arrays: list[Sized], storage: SharedMemoryStorage):
+        self.storage = storage
+        DirtyTracker.__init__(self, arrays)
+
+    def relayout(self, arrays: list[Sized]):
+        self.stamps = [self.storage.zeros(len(array)) for array in arrays]
+        self.block_stamps = [self.storage.zeros(block_count(len(array))) for array in arrays]
+        self.layout_epoch = self.epoch
+
+
+def array_layout(playground: SortPlayground) -> list[ArrayLayout]:
+    """The layout of a playground built by a `SharedMemoryStorage`, tracked by a `SharedDirtyTracker`."""
+    return [
+        (array.block_name, len(array), array.dtype.str, stamps.block_name, block_stamps.block_name)
+        for array, stamps, block_stamps in zip(playground.arrays, playground.dirty.stamps, playground.dirty.block_stamps)
+    ]
+
+
+def write_header(header: numpy.ndarray, playground: SortPlayground, **values):
+    """
+    Writes the pointers, statistics and dirty epochs of `playground` into `header`,
+    along with `values` (other fields of `HEADER_DTYPE`).
+    """
+    header["sequence"] += 1
+
+    header["epoch"] = playground.dirty.epoch
+    header["layout_epoch"] = playground.dirty.layout_epoch
+
+    pointers = playground.pointers
+    count = min(pointers.count, REGISTER_SLOTS)
+    # See `REGISTER_SLOTS`.
+    header["register_count"] = count
+    if count:
+        header["register_positions"][:count] = pointers.positions[:count]
+        header["register_kinds"][:count] = pointers.kinds[:count]
+
+    header["statistics"] = [getattr(playground.statistics, name) for name in STATISTICS_FIELDS]
+
+    for name, value in values.items():
+        header[name] = value
+
+    header["sequence"] += 1
+
+
+def read_header(header: numpy.ndarray) -> numpy.ndarray:
+    """Returns a copy of `header`, once it isn't being written."""
+    while True:
+        sequence = int(header["sequence"])
+        copy = header.copy()
+
+        if not sequence & 1 and int(header["sequence"]) == sequence:
+            return copy
+
+
+class SharedDirtyReader:
+    """Like `DirtyReader`, for the stamps of a `SharedPlayground`, which are stamped by another process."""
+
+    def __init__(self, playground: "SharedPlayground"):
+        self.playground = playground
+        self.seen_epoch: int = 0
+
+    def read(self) -> list[numpy.ndarray] | None:
+        playground = self.playground
+        seen_epoch = self.seen_epoch
+
+        self.seen_epoch = playground.epoch + 1
+        # The writing process stamps each batch of steps with its own epoch,
+        # and `playground.epoch` is the latest batch that was published.
+
+        if playground.layout_epoch >= seen_epoch:
+            return None
+
+        return [written_since(stamps, block_stamps, seen_epoch)
+                for stamps, block_stamps in zip(playground.stamps, playground.block_stamps)]
+
+
+class SharedPlayground(SortPlayground):
+    """
+    The reading side of a playground in another process.
+
+    Its arrays are the other process's arrays, mapped (not copied).
+    Its pointers and statistics are the ones in the latest header applied.
+    Readers should hold `self.lock`, like with `Snapshot`.
+    """
+
+    def __init__(self):
+        SortPlayground.__init__(self, 0)
+        self.arrays = []
+
+        self.lock = Lock()
+
+        self.blocks: dict[str, SharedMemory] = {}
+        self.retired: list[SharedMemory] = []
+        self.stamps: list[numpy.ndarray] = []
+        self.block_stamps: list[numpy.ndarray] = []
+
+        self.epoch: int = 0
+        self.layout_epoch: int = 0
+        self.applied_layout_epoch: int = -1
+        # The layout epoch of the arrays mapped right now.
+
+    def apply_layout(self, layout_epoch: int, layout: list[ArrayLayout]):
+        """Maps the arrays and stamps in `layout`, which the writer started using at `layout_epoch`."""
+        blocks: dict[str, SharedMemory] = {}
+
+        def attach(name: str) -> SharedMemory:
+            if name not in blocks:
+                blocks[name] = self.blocks.pop(name) if name in self.blocks else SharedMemory(name)
+            return blocks[name]
+
+        arrays = []
+        stamps = []
+        block_stamps = []
+        for array_name, length, dtype, stamps_name, block_stamps_name in layout:
+            arrays.append(shared_array(attach(array_name), length, dtype))
+            stamps.append(shared_array(attach(stamps_name), length, numpy.int64))
+            block_stamps.append(shared_array(attach(block_stamps_name), block_count(length), numpy.int64))
+
+        self.arrays = arrays
+        self.stamps = stamps
+        self.block_stamps = block_stamps
+        self.applied_layout_epoch = layout_epoch
+
+        self.retired.extend(self.blocks.values())
+        self.blocks = blocks
+
+        retired = self.retired
+        self.retired = []
+        for block in retired:
+            try:
+                block.close()
+            except BufferError:
+                self.retired.append(block)
+
+    def apply_header(self, header: numpy.ndarray) -> bool:
+        """
+        Takes the pointers, statistics and epochs in `header` (from `read_header`).
+        Returns False if the header is for arrays that aren't mapped yet, and was ignored.
+        """
+        if int(header["layout_epoch"]) != self.applied_layout_epoch:
+            return False
+
+        self.epoch = int(header["epoch"])
+        self.layout_epoch = int(header["layout_epoch"])
+
+        count = int(header["register_count"])
+        positions: list[Pointer] = [tuple(position) for position in header["register_positions"][:count].tolist()]
+        self.pointers.assign(dict(zip(positions, header["register_kinds"][:count].tolist())))
+
+        self.statistics = Statistics(*header["statistics"].tolist())
+        return True
+
+    def dirty_reader(self) -> SharedDirtyReader:
+        return SharedDirtyReader(self)
+
+    def close(self):
+        self.arrays = []
+        self.stamps = []
+        self.block_stamps = []
+
+        for block in [*self.blocks.values(), *self.retired]:
+            try:
+                block.close()
+            except BufferError:
+                pass
+        self.blocks = {}
+        self.retired = []
@@ -0,0 +1,128 @@
+from algorithms.playground import SortPlayground, AccessRegister, Statistics, Pointer
+from algorithms.dirty import DirtyReader
+from dataclasses import dataclass, field, replace
+from threading import Lock
+import numpy
+
+Changes = list[numpy.ndarray] | None
+# What `DirtyReader.read` returns.
+
+
+def merge_changes(all_changes: list[Changes], array_count: int) -> Changes:
+    """Merges several results of `DirtyReader.read` (for `array_count` arrays) into one."""
+    merged: Changes = [numpy.zeros(0, dtype=numpy.intp) for _ in range(array_count)]
+
+    for changes in all_changes:
+        if changes is None or len(changes) != array_count:
+            return None
+
+        merged = [numpy.concatenate(pair) for pair in zip(merged, changes)]
+
+    return merged
+
+
+@dataclass
+class SnapshotBuffer:
+    """One of the two copies of a playground's state kept by a `Snapshot`."""
+    arrays: list[numpy.ndarray] = field(default_factory=list)
+    pointers: AccessRegister = field(default_factory=AccessRegister)
+    named_pointers: dict[str, Pointer] = field(default_factory=dict)
+    statistics: Statistics = field(default_factory=Statistics)
+
+    pending: list[Changes] = field(default_factory=list)
+    """Changes of the source since this buffer was last filled."""
+
+
+class Snapshot(SortPlayground):
+    """
+    A copy of another playground (the "source"), that can be read from another thread
+    while the source keeps changing.
+
+    The source's thread fills a back buffer with `self.publish`, without any locks,
+    and only holds `self.lock` to swap it with the front buffer (`self.arrays`, `self.pointers`, etc).
+    Readers hold `self.lock` while reading the front buffer, and it never changes under them.
+
+    Only the positions the source wrote since a buffer was last filled
+    are copied into it (see `SortPlayground.dirty_reader`),
+    and the same positions are marked as written in this playground,
+    so renderers reading it only redraw what changed.
+    """
+
+    def __init__(self, source: SortPlayground):
+        SortPlayground.__init__(self, 0)
+        self.arrays = []
+
+        self.source = source
+        self.source_reader: DirtyReader = source.dirty_reader()
+
+        self.lock = Lock()
+        self.back = SnapshotBuffer()
+        self.front_pending: list[Changes] = [None]
+        # The front buffer was never filled.
+        self.back.pending = [None]
+
+        self.unpublished: list[Changes] = []
+        """Changes applied to the back buffer since it was last swapped to the front."""
+
+    def publish(self) -> bool:
+        """
+        Copies the source's current state into the back buffer, and swaps it to the front.
+        Must be called from the source's thread.
+
+        Returns False if a reader was holding `self.lock`, and the swap has to be tried again later.
+        """
+        changes: Changes = self.source_reader.read()
+        self.back.pending.append(changes)
+        self.front_pending.append(changes)
+
+        self.unpublished.append(self.fill(self.back))
+
+        if not self.lock.acquire(blocking=False):
+            return False
+        # The back buffer stays filled, and only needs newer changes next time.
+
+        try:
+            self.arrays, self.back.arrays = self.back.arrays, self.arrays
+            self.pointers, self.back.pointers = self.back.pointers, self.pointers
+            self.named_pointers, self.back.named_pointers = self.back.named_pointers, self.named_pointers
+            self.statistics, self.back.statistics = self.back.statistics, self.statistics
+            self.back.pending, self.front_pending = self.front_pending, self.back.pending
+
+            if self.dirty is not None:
+                applied: Changes = merge_changes(self.unpublished, len(self.arrays))
+
+                if applied is None:
+                    self.dirty.relayout(self.arrays)
+                else:
+                    for array_index, num_indices in enumerate(applied):
+                        self.dirty.mark_all(array_index, num_indices)
+        finally:
+            self.lock.release()
+
+        self.unpublished = []
+        return True
+
+    def fill(self, buffer: SnapshotBuffer) -> Changes:
+        """Makes `buffer` a copy of the source, and returns the changes it applied (like `DirtyReader.read`)."""
+        source = self.source
+
+        changes: Changes = merge_changes(buffer.pending, len(buffer.arrays))
+        buffer.pending = []
+
+        if changes is None:
+            buffer.arrays = [numpy.array(array, dtype=numpy.int64) for array in source.arrays]
+        else:
+            for buffer_array, source_array, num_indices in zip(buffer.arrays, source.arrays, changes):
+                if not len(num_indices):
+                    continue
+
+                if isinstance(source_array, numpy.ndarray):
+                    buffer_array[num_indices] = source_array[num_indices]
+                else:
+                    buffer_array[num_indices] = list(map(source_array.__getitem__, num_indices.tolist()))
+
+        buffer.pointers.assign(dict(source.pointers.items()))
+        buffer.named_pointers = source.named_pointers.copy()
+        buffer.statistics = replace(source.statistics)
+
+        return changes
@@ -0,0 +1,288 @@
+"""
+Renders the sound of a run into a WAV file, without a sound device,
+with the same notes `AudioControl` plays (see `algorithms.synth`), but much faster than real time.
+
+The run can be a live one (run headlessly while it's rendered) or a recorded trace (see `algorithms.trace`).
+
+Run it with `python -m algorithms.sonify --help`.
+"""
+from algorithms.playground import SortPlayground
+from algorithms.events import AccessEvents, EVENTS_CAPACITY
+from algorithms.synth import Voices, Waveform, PitchTable, note_duration, waveforms
+from algorithms.trace import (read_trace, OP_READ, OP_WRITE, OP_INCREMENT, OP_SWAP, OP_COMPARE,
+                              OP_SPAWN, OP_DELETE, OP_LOAD, OP_LOAD_ARRAY, OP_ITER, OP_RESET)
+from algorithms.inputs import Linear, inputs
+from algorithms.algorithms import Shuffle, Verify, shuffles
+from algorithms.sorts import Concurrent, sorts
+from dataclasses import dataclass
+from itertools import chain, islice
+from time import perf_counter
+from typing import Iterable, Iterator
+import argparse
+import numpy
+import sys
+import wave
+
+Events = tuple[numpy.ndarray, numpy.ndarray]
+# (nums, times): the nums of some accesses, and when they happened (in seconds from the start of the run).
+
+
+def run_events(playground: SortPlayground, algorithms: Iterator, speed: float,
+               chunk_steps: int = 1024, chunk_events: int = EVENTS_CAPACITY) -> Iterator[Events]:
+    """
+    Runs `algorithms` on `playground` to the end, and yields the events of every one of its accesses
+    (the same ones `AudioControl` hears), timed as if it ran at `speed` steps per second:
+    every `chunk_steps` steps, or sooner, after the step that pushes the chunk past `chunk_events` events
+    (steps that do a whole layer of a sorting network access thousands of nums).
+    """
+    events = AccessEvents(capacity=1)
+    # Never committed, so its buffer isn't used.
+    playground.events = events
+    step = 0
+
+    try:
+        while True:
+            chunk_start = step
+            full = False
+
+            for _ in islice(algorithms, chunk_steps):
+                step += 1
+                events.time = step / speed
+                # Each step runs before the loop's body, so this is the time of the next step.
+
+                if len(events.pushed_nums) >= chunk_events:
+                    full = True
+                    break
+
+            yield events.take()
+
+            if not full and step - chunk_start < chunk_steps:
+                return
+    finally:
+        playground.events = None
+
+
+def trace_events(records: numpy.ndarray, speed: float, chunk_records: int = 1 << 16) -> Iterator[Events]:
+    """
+    Yields the events of the accesses in a trace's `records`, `chunk_records` records at a time,
+    timed as if one operation ran every `1 / speed` seconds.
+
+    Traces don't know which operations happened in the same step,
+    so runs with several operations per step sound slower than they would live.
+    """
+    arrays: list[list[int]] = []
+    operation = 0
+
+    for chunk_start in range(0, len(records), chunk_records):
+        nums: list[int] = []
+        times: list[float] = []
+
+        for opcode, array_index, index, other_array_index, other_index, value in records[chunk_start:chunk_start + chunk_records].tolist():
+            time = operation / speed
+
+            if opcode in (OP_READ, OP_ITER):
+                nums.append(value)
+                times.append(time)
+            elif opcode == OP_WRITE:
+                arrays[array_index][index] = value
+                nums.append(value)
+                times.append(time)
+            elif opcode == OP_INCREMENT:
+                arrays[array_index][index] += value
+                nums.append(arrays[array_index][index])
+                times.append(time)
+            elif opcode in (OP_COMPARE, OP_SWAP):
+                array_a, array_b = arrays[array_index], arrays[other_array_index]
+
+                if opcode == OP_SWAP:
+                    array_a[index], array_b[other_index] = array_b[other_index], array_a[index]
+
+                nums += (array_a[index], array_b[other_index])
+                times += (time, time)
+            elif opcode == OP_LOAD:
+                arrays[array_index][index] = value
+                continue
+            elif opcode == OP_LOAD_ARRAY:
+                if array_index < len(arrays):
+                    arrays[array_index] = [0] * value
+                else:
+                    arrays.append([0] * value)
+                continue
+            elif opcode == OP_SPAWN:
+                arrays.append([0] * value)
+            elif opcode == OP_DELETE:
+                arrays.pop(array_index)
+            elif opcode == OP_RESET:
+                del arrays[1:]
+                continue
+            # Same as `algorithms.replay.apply_records`, with lists, which are faster to index one num at a time.
+
+            operation += 1
+            # Loading the arrays takes no time.
+
+        yield numpy.array(nums, dtype=numpy.int64), numpy.array(times)
+
+
+def trace_main_array_len(records: numpy.ndarray) -> int:
+    """The length of the main array when a trace's recording started."""
+    loads = numpy.flatnonzero((records["opcode"] == OP_LOAD_ARRAY) & (records["array"] == 0))
+    return int(records["value"][loads[0]]) if len(loads) else 0
+
+
+@dataclass
+class Rendering:
+    """What rendering a run into a WAV file did."""
+    path: str
+    frames: int
+    samplerate: float
+    accesses: int
+    seconds: float
+    stolen: int
+    merged: int
+
+    def __str__(self) -> str:
+        duration = self.frames / self.samplerate
+        return (
+            f"{self.path}: {duration:.1f}s of audio from {self.accesses} accesses, "
+            f"rendered in {self.seconds:.2f}s ({duration / self.seconds if self.seconds else float('inf'):,.0f}x real time), "
+            f"{self.stolen} voices stolen, {self.merged} notes merged"
+        )
+
+
+def render(
+    events: Iterable[Events],
+    path: str,
+    main_array_len: int,
+    speed: float,
+    octaves: int = 4,
+    lowest: float = 210,
+    samplerate: int = 44100,
+    blocksize: int = 210,
+    max_voices: int = 256,
+    waveform: Waveform | None = None,
+    gain: float = 1,
+    blocks_per_write: int = 256,
+) -> Rendering:
+    """
+    Renders `events` into a 16-bit mono WAV file at `path`, with the same notes, envelopes and voice pool
+    as an `AudioControl` with the same settings, one block of `blocksize` frames at a time.
+    The notes are added up and clipped like the sound device does, after being scaled by `gain`.
+
+    Only the events of one chunk, and `blocks_per_write` blocks of audio, are in memory at once.
+    """
+    start = perf_counter()
+
+    pitch_table = PitchTable.build(main_array_len, octaves, lowest, samplerate)
+    voices = Voices(max_voices, waveform=waveform)
+    duration = note_duration(samplerate, speed, blocksize * 2)
+
+    next_block = 0
+    frames = 0
+    accesses = 0
+    pending_nums = numpy.zeros(0, dtype=numpy.int64)
+    pending_positions = numpy.zeros(0, dtype=numpy.int64)
+
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(samplerate)
+
+        def write_blocks(nums: numpy.ndarray, positions: numpy.ndarray, end_block: int):
+            """Renders the blocks up to `end_block`, starting the notes of `nums` at `positions` (in frames)."""
+            nonlocal next_block, frames
+
+            for first_block in range(next_block, end_block, blocks_per_write):
+                last_block = min(first_block + blocks_per_write, end_block)
+                bounds = numpy.searchsorted(positions, numpy.arange(first_block, last_block + 1) * blocksize).tolist()
+                blocks = []
+
+                for block, low, high in zip(range(first_block, last_block), bounds, bounds[1:]):
+                    voices.start(pitch_table.note_increments(nums[low:high]), positions[low:high] - block * blocksize)
+                    blocks.append(voices.render(blocksize, duration))
+
+                samples = numpy.clip(numpy.concatenate(blocks) * gain, -1, 1)
+                wav.writeframes((samples * 32767).astype("<i2").tobytes())
+                frames += len(samples)
+
+            next_block = max(next_block, end_block)
+
+        for nums, times in events:
+            accesses += len(nums)
+            nums = numpy.concatenate((pending_nums, nums))
+            positions = numpy.concatenate((pending_positions, (times * samplerate).astype(numpy.int64)))
+
+            if not len(nums):
+                continue
+
+            end_block = int(positions[-1]) // blocksize
+            ready = positions < end_block * blocksize
+            # The last block may get more events from the next chunk.
+
+            write_blocks(nums[ready], positions[ready], end_block)
+            pending_nums, pending_positions = nums[~ready], positions[~ready]
+
+        if len(pending_nums):
+            write_blocks(pending_nums, pending_positions, int(pending_positions[-1]) // blocksize + 1)
+
+        empty = numpy.zeros(0, dtype=numpy.int64)
+        while len(voices):
+            write_blocks(empty, empty, next_block + 1)
+        # Let the last notes fade out.
+
+    return Rendering(path, frames, samplerate, accesses, perf_counter() - start, voices.stolen, voices.merged)
+
+
+def main(argv: list[str] | None = None) -> int:
+    sort_classes = {sort_cls.__doc__: sort_cls for sort_cls in sorts}
+    input_classes = {input_cls.__doc__: input_cls for input_cls in inputs}
+    shuffle_classes = {shuffle_cls.__doc__: shuffle_cls for shuffle_cls in shuffles}
+    waveform_classes = {waveform_cls.__doc__: waveform_cls for waveform_cls in waveforms}
+
+    parser = argparse.ArgumentParser(description="Renders the sound of a run into a WAV file.")
+    parser.add_argument("output", help="Path of the WAV file.")
+    parser.add_argument("--trace", default=None,
+                        help="Renders this recorded trace, instead of running a sort.")
+    parser.add_argument("--sort", choices=sort_classes.keys(), default="Quick Sort")
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--input", choices=input_classes.keys(), default=Linear.__doc__)
+    parser.add_argument("--shuffle", choices=shuffle_classes.keys(), default=Shuffle.__doc__)
+    parser.add_argument("--speed", type=float, default=500,
+                        help="Steps per second (operations per second for traces).")
+    parser.add_argument("--waveform", choices=waveform_classes.keys(), default="Sine")
+    parser.add_argument("--voices", type=int, default=256, help="The most notes that can play at once.")
+    parser.add_argument("--octaves", type=int, default=4)
+    parser.add_argument("--samplerate", type=int, default=44100)
+    parser.add_argument("--gain", type=float, default=1,
+                        help="Scales the sound before it's clipped (lower it if many notes play at once).")
+    args = parser.parse_args(argv)
+
+    if args.trace is not None:
+        records = read_trace(args.trace)
+        main_array_len = trace_main_array_len(records)
+        events = trace_events(records, args.speed)
+    else:
+        playground = SortPlayground(args.size)
+        main_array_len = args.size
+        sort = sort_classes[args.sort](playground)
+
+        if isinstance(sort, Concurrent):
+            sort.prepare()
+        # Instead of the run starting without its compiled network (see `Concurrent.run`).
+
+        algorithms = chain(input_classes[args.input](playground).run(),
+                           shuffle_classes[args.shuffle](playground).run(),
+                           sort.run(),
+                           Verify(playground).run())
+        events = run_events(playground, algorithms, args.speed)
+
+    print(render(events, args.output, main_array_len, args.speed,
+                 octaves=args.octaves,
+                 samplerate=args.samplerate,
+                 max_voices=args.voices,
+                 waveform=waveform_classes[args.waveform](),
+                 gain=args.gain))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,17 @@
 from algorithms.algorithms import *
 from algorithms.algorithm import Option
-from typing import Iterable, Callable, Generator
+from algorithms.playground import SortPlayground, Statistics
+from algorithms.networks import CompiledNetwork, Layer, network_cache
+from typing import Iterable, Iterator, Callable, Generator
+from concurrent.futures import Executor, wait
 from itertools import count, chain, cycle
 from dataclasses import dataclass, field
 from math import sqrt, floor
 from random import randint
+import logging
+import numpy
+
+logger = logging.getLogger(__name__)
 
 class BubbleSort(Algorithm):
     """Bubble Sort"""
@@ -424,8 +431,8 @@ class HeapSort(Reversal):
                     right_child = self.playground.read((0, right_child_index))
                     yield
 
-                    child_index = left_child_index if eval(
-                        f"{right_child}{comparison}{left_child}") else right_child_index
+                    child_index = left_child_index if self.playground.comparator.resolve(comparison)(
+                        right_child, left_child) else right_child_index
                     # must swap with its smallest child if mode is min;
                     # must swap with its biggest child if mode is max.
                 else:
@@ -1145,11 +1152,199 @@ class RadixLSDSortInPlace(RadixLSDSort):
                 break
 
 
+@dataclass
 class RadixMSDSort(RadixSort):
     """Radix MSD Sort"""
+    options: dict[str, Option] = field(default_factory={
+        "base": Option(10, range(2, 1025)),
+        "insertion sort below": Option(16, range(1, 257)),
+    }.copy)
+    pool: Executor | None = None
+    """
+    When given (like by `algorithms.headless`), the array is split into buckets here
+    until there are a few for each of its `workers`, then they're sorted in it,
+    each in its own playground (see `sort_radix_msd_bucket`), and written back all at once.
+    """
+    workers: int = 1
+
+    def distribute(self, start: int, end: int, place: int, bucket_ends: list[int]):
+        """
+        Moves the nums in [start, end) of the main array into buckets by their digit at `place`,
+        through the copy array (at index 1) and an array of counts, then offsets, of each digit,
+        and appends where each bucket ends to `bucket_ends`.
+        """
+        base = self.options["base"].value
+
+        self.playground.spawn_new_array(base)
+        count_array_index = 2
+        yield
+
+        for index in range(start, end):
+            num = self.playground.read((0, index))
+            yield
+
+            self.playground.write(num, (1, index))
+            yield
+
+            self.playground.increment(1, (count_array_index, num // place % base))
+            yield
+        # copy and count
+
+        offset = start
+        for digit in range(base):
+            digit_count = self.playground.read((count_array_index, digit))
+            yield
+
+            self.playground.write(offset, (count_array_index, digit))
+            yield
+
+            offset += digit_count
+            bucket_ends.append(offset)
+        # offsets
+
+        for index in range(start, end):
+            num = self.playground.read((1, index))
+            yield
+
+            digit = num // place % base
+
+            destination = self.playground.read((count_array_index, digit))
+            yield
+
+            self.playground.write(num, (0, destination))
+            yield
+
+            self.playground.increment(1, (count_array_index, digit))
+            yield
+        # re-write bucket
+
+        self.playground.delete_array(count_array_index)
+
+    def msd(self, start: int, end: int, place: int):
+        """Sorts [start, end) of the main array by its digits from `place` down."""
+        if end - start < 2:
+            return
+
+        if end - start < self.options["insertion sort below"].value:
+            for _ in InsertionSort._run(self, start, end):
+                yield
+            return
+
+        bucket_ends: list[int] = []
+        for _ in self.distribute(start, end, place, bucket_ends):
+            yield
+
+        if place == 1:
+            return
+
+        bucket_start = start
+        for bucket_end in bucket_ends:
+            for _ in self.msd(bucket_start, bucket_end, place // self.options["base"].value):
+                yield
+
+            bucket_start = bucket_end
+
+    def msd_in_pool(self, start: int, end: int, place: int):
+        """
+        Like `self.msd`, splitting the biggest bucket left until there are `4 * self.workers` of them
+        (or none can be split anymore), then sorting them in `self.pool`, all at the same time.
+        """
+        base = self.options["base"].value
+        min_bucket_len = max(self.options["insertion sort below"].value, 2)
+        # Smaller buckets are insertion sorted here, which is quicker than sending them.
+
+        buckets: list[tuple[int, int, int]] = []
+        # (start, end, place): a bucket still to be sorted by its digits from `place` down.
+
+        if end - start < min_bucket_len:
+            for _ in self.msd(start, end, place):
+                yield
+        else:
+            buckets.append((start, end, place))
+
+        while buckets and len(buckets) < 4 * self.workers:
+            bucket = max(buckets, key=lambda bucket: bucket[1] - bucket[0])
+            buckets.remove(bucket)
+            bucket_start, bucket_end, bucket_place = bucket
+            # Nums often share their first digits (like 1..100000 in base 10, which only has 2 top-level buckets),
+            # so splitting only the top level could leave a single bucket with almost every num.
+
+            bucket_ends: list[int] = []
+            for _ in self.distribute(bucket_start, bucket_end, bucket_place, bucket_ends):
+                yield
+
+            if bucket_place == 1:
+                continue
+
+            for bucket_end in bucket_ends:
+                if bucket_end - bucket_start < min_bucket_len:
+                    for _ in self.msd(bucket_start, bucket_end, bucket_place // base):
+                        yield
+                else:
+                    buckets.append((bucket_start, bucket_end, bucket_place // base))
+
+                bucket_start = bucket_end
+
+        futures = []
+        for bucket_start, bucket_end, bucket_place in buckets:
+            nums = [int(num) for num in self.playground.main_array[bucket_start:bucket_end]]
+            futures.append((bucket_start, self.pool.submit(sort_radix_msd_bucket, nums, bucket_place, self.options)))
+        # Every bucket is sent before waiting for any of them.
+
+        for bucket_start, future in futures:
+            nums, statistics = future.result()
+
+            self.playground.write_slice(nums, (0, bucket_start))
+            for name, value in vars(statistics).items():
+                setattr(self.playground.statistics, name, getattr(self.playground.statistics, name) + value)
+            yield
+
     def run(self):
+        nums_len = self.playground.main_array_len
+        base = self.options["base"].value
+
+        largest_num = 0
+        for num in self.playground.array_iter(0):
+            yield
+            largest_num = max(largest_num, num)
+
+        place = 1
+        while place * base <= largest_num:
+            place *= base
+        # The most significant digit.
+
+        self.playground.spawn_new_array(nums_len)
+        yield
+        # nums copy
+
+        if self.pool is None or self.playground.recorder is not None:
+            for _ in self.msd(0, nums_len, place):
+                yield
+        else:
+            for _ in self.msd_in_pool(0, nums_len, place):
+                yield
+        # What the pool does isn't recorded in this playground's trace.
+
+        self.playground.delete_array(1)
+
+
+def sort_radix_msd_bucket(nums: list[int], place: int, options: dict[str, Option]) -> tuple[list[int], Statistics]:
+    """
+    Sorts a bucket of a `RadixMSDSort` by its digits from `place` down, in a playground of its own
+    (in a worker process of its pool). Returns the sorted nums, and the statistics of sorting them.
+    """
+    playground = SortPlayground(0)
+    playground.arrays = [playground.storage.convert(nums)]
+
+    playground.spawn_new_array(len(nums))
+    playground.statistics = Statistics()
+    # The copy array is already counted in the sort's playground.
+
+    for _ in RadixMSDSort(playground, options).msd(0, len(nums), place):
         pass
 
+    return [int(num) for num in playground.main_array], playground.statistics
+
 
 class PigeonholeSort(Algorithm):
     """Pigeonhole Sort"""
@@ -2115,12 +2310,100 @@ How did this happen?""")
         self.playground.delete_array(-1)
 
 
+@dataclass
 class Concurrent(Algorithm):
     """Concurrent Sorts"""
-    options: dict[str, Option] = field(default_factory={"run in parallel": False}.copy)
+    options: dict[str, Option] = field(default_factory={"run in parallel": Option(False, (False, True))}.copy)
+    # Subclasses spell their network out in `self.run_sequentially`, one comparator per step,
+    # or give its layers right away with `cls.network_layers`.
+    # Runs replay the network compiled from them (see `algorithms.networks`) once it's cached,
+    # one comparator per step, or one layer per step in parallel,
+    # which is as deep as the comparators chain (see `CompiledNetwork`).
 
     def run(self):
-        raise NotImplementedError
+        parallel = self.options["run in parallel"].value
+
+        if parallel:
+            layers = self.network_layers(self.playground.main_array_len)
+
+            if layers is not None:
+                for _ in self.run_layers(layers):
+                    yield
+                return
+        # Layers given right away don't need compiling.
+
+        network = network_cache.ready(type(self), self.playground.main_array_len)
+
+        if network is None:
+            future = network_cache.get_in_background(type(self), self.playground.main_array_len)
+
+            if parallel and future in wait([future], timeout=0.1).done:
+                network = future.result()
+            elif parallel:
+                logger.warning("%s (n=%d) is still compiling, so this run does one comparator per step instead of "
+                               "one layer per step.", type(self).__doc__, self.playground.main_array_len)
+        # Compiling a big network takes long enough that waiting for it would hang the run (and its commands),
+        # so until it's cached, runs do the comparators of `self.run_sequentially` (in parallel, unless it's done in a moment).
+
+        if network is None:
+            for _ in self.run_sequentially():
+                yield
+        elif parallel:
+            for _ in self.run_layers(network.layers()):
+                yield
+        else:
+            for _ in self.run_comparators(network):
+                yield
+
+    def prepare(self) -> CompiledNetwork | None:
+        """
+        Loads or compiles the network runs replay, right away,
+        for runners that would rather wait for it than have `self.run` start without it.
+        Returns None for lengths the network doesn't support (its run fails on them by itself).
+        """
+        try:
+            return network_cache.get(type(self), self.playground.main_array_len)
+        except IndexError:
+            return None
+
+    def run_sequentially(self):
+        """Does one comparator (and its swap, if needed) per step."""
+        layers = self.network_layers(self.playground.main_array_len)
+        if layers is None:
+            raise NotImplementedError("Concurrent is abstract.")
+        # Subclasses without `cls.network_layers` spell their comparators out instead.
+
+        for lows, highs in layers:
+            for low, high in zip(lows.tolist(), highs.tolist()):
+                should_swap = self.playground.compare((0, low), ">", (0, high))
+                yield
+
+                if should_swap:
+                    self.playground.swap((0, low), (0, high))
+                    yield
+
+    @classmethod
+    def network_layers(cls, main_array_len: int) -> Iterator[Layer] | None:
+        """The layers of the network for `main_array_len`, if they can be given without `cls.run_sequentially`."""
+        return None
+
+    def run_comparators(self, network: CompiledNetwork):
+        """Does the comparators of `network` in their order, one (and its swap, if needed) per step."""
+        lows, highs = network.lows_highs(network.comparators)
+
+        for low, high in zip(lows.tolist(), highs.tolist()):
+            should_swap = self.playground.compare((0, low), ">", (0, high))
+            yield
+
+            if should_swap:
+                self.playground.swap((0, low), (0, high))
+                yield
+
+    def run_layers(self, layers: Iterable[Layer]):
+        """Does every comparator of a layer (none of which share positions) in one step."""
+        for lows, highs in layers:
+            self.playground.compare_exchange(lows, highs)
+            yield
 
 
 class BatchersBitonicSort(Concurrent):
@@ -2158,14 +2441,14 @@ class BatchersBitonicSort(Concurrent):
                        self.merge(start, section_len, direction)):
             yield
 
-    def run(self):
+    def run_sequentially(self):
         for _ in self.bitonic(0, self.playground.main_array_len, True):
             yield
 
 
 class IRBitonicSort(BatchersBitonicSort):
     """Bitonic Sort (Iterative Network, Recursive Merge)"""
-    def run(self):
+    def run_sequentially(self):
         """Assumes main array has a power of 2 as its length."""
         section_len = 2
         while section_len <= self.playground.main_array_len:
@@ -2178,7 +2461,7 @@ class IRBitonicSort(BatchersBitonicSort):
 
 class IterativeBitonicSort(BatchersBitonicSort):
     """Iterative Bitonic Sort"""
-    def run(self):
+    def run_sequentially(self):
         """Assumes main array has a power of 2 as its length."""
         section_len = 2
         while section_len <= self.playground.main_array_len:
@@ -2252,7 +2535,7 @@ class PairwiseSortingNetwork(Concurrent):
                        self.merge(start, amount, step)):
             yield
 
-    def run(self):
+    def run_sequentially(self):
         """Assumes list's length is a power of 2."""
         for _ in self.sorting_network(0, self.playground.main_array_len, 1):
             yield
@@ -2289,14 +2572,14 @@ class OddEvenMergesort(Concurrent):
                        self.merge(start, amount)):
             yield
 
-    def run(self):
+    def run_sequentially(self):
         for _ in self.network(0, self.playground.main_array_len):
             yield
 
 
 class IROddEvenMergesort(OddEvenMergesort):
     """Odd-Even Mergesort (Iterative Network, Recursive Merge)"""
-    def run(self):
+    def run_sequentially(self):
         amount = 2
         while amount <= self.playground.main_array_len:
             for start in range(0, self.playground.main_array_len, amount):
@@ -2307,7 +2590,7 @@ class IROddEvenMergesort(OddEvenMergesort):
 
 class IterativeOddEvenMergesort(OddEvenMergesort):
     """Iterative Odd-Even Mergesort"""
-    def run(self):
+    def run_sequentially(self):
         amount = 2
         while amount <= self.playground.main_array_len:
 
@@ -2328,23 +2611,38 @@ class IterativeOddEvenMergesort(OddEvenMergesort):
             amount *= 2
 
 
+@dataclass
 class ParallelOddEvenMergeSort(Concurrent):
     """Parallel Odd Even Merge Sort"""
-    def run(self):
-        merge_len: int = 1
+    options: dict[str, Option] = field(default_factory={"run in parallel": Option(True, (False, True))}.copy)
+
+    @classmethod
+    def network_layers(cls, main_array_len: int) -> Iterator[Layer]:
+        """
+        Batcher's odd-even merge sort, one layer for each comparison distance of each merge.
+        Comparators past the end are left out, which is the same as padding the array
+        up to a power of 2 with nums greater than every num (they would never swap).
+        """
+        positions = numpy.arange(main_array_len)
+
+        merge_len = 1
+        while merge_len < main_array_len:
+            double_merge_len = merge_len * 2
 
-        while merge_len <= self.playground.main_array_len:
-            section_len: int = merge_len << 1
+            comb_len = merge_len
+            while comb_len:
+                lows = positions[:max(main_array_len - comb_len, 0)]
+                offsets = lows - comb_len % merge_len
+                lows = lows[(offsets >= 0) & (offsets % (2 * comb_len) < comb_len)
+                            & (lows // double_merge_len == (lows + comb_len) // double_merge_len)]
+                # Comparators `comb_len` apart, in runs of `comb_len` every `2 * comb_len`,
+                # shifted by `comb_len % merge_len`, and within the same pair of sections being merged.
 
-            parallel_len: int = section_len
+                if len(lows):
+                    yield lows, lows + comb_len
 
-            comb_len: int = merge_len
-            while comb_len >= 2:
-                for section_start_index in range(0, self.playground.main_array_len, section_len):
-                    pass
-                comb_len >>= 1
-                parallel_len >>= 1
-            merge_len <<= 1                
+                comb_len //= 2
+            merge_len = double_merge_len
 
 
 class TimeSort(Algorithm):
@@ -2511,9 +2809,9 @@ sorts = [BubbleSort, OptimizedBubbleSort, CocktailShakerSort, OptimizedCocktailS
          SelectionSort, MaxHeapSort, MinHeapSort, OptimizedMaxHeapSort, OptimizedMinHeapSort,
          QuickSort,
          MergeSort, MergeSortInPlace,
-         RadixLSDSort, RadixLSDSortInPlace, PigeonholeSort, CountSort, GravitySort,
+         RadixLSDSort, RadixLSDSortInPlace, RadixMSDSort, PigeonholeSort, CountSort, GravitySort,
          SquareRootSort,
          BatchersBitonicSort, IRBitonicSort, IterativeBitonicSort, PairwiseSortingNetwork,
-         OddEvenMergesort, IROddEvenMergesort, IterativeOddEvenMergesort,
+         OddEvenMergesort, IROddEvenMergesort, IterativeOddEvenMergesort, ParallelOddEvenMergeSort,
          TimeSort,
          SlowSort, BogoSort, BozoSort]
@@ -0,0 +1,61 @@
+from dataclasses import dataclass
+from typing import Iterable
+import numpy
+
+
+class Storage:
+    """
+    Backend that builds the arrays of a `SortPlayground`.
+
+    The playground only ever indexes its arrays (`array[index]`,
+    `array[index] = num`, `len(array)` and iterating over them),
+    so any backend whose arrays support those operations can be plugged in.
+    """
+
+    def zeros(self, size: int):
+        """Returns a new array of length `size` that only contains zeros."""
+        raise NotImplementedError("Storage is abstract.")
+
+    def linear(self, size: int):
+        """Returns a new array containing all the numbers in `range(1, size + 1)`."""
+        raise NotImplementedError("Storage is abstract.")
+
+    def convert(self, nums: Iterable[int]):
+        """Returns a new array of this backend containing `nums`."""
+        raise NotImplementedError("Storage is abstract.")
+
+
+class ListStorage(Storage):
+    """Python Lists"""
+    def zeros(self, size: int) -> list[int]:
+        return [0] * size
+
+    def linear(self, size: int) -> list[int]:
+        return list(range(1, size + 1))
+
+    def convert(self, nums: Iterable[int]) -> list[int]:
+        return [int(num) for num in nums]
+
+
+@dataclass
+class NumpyStorage(Storage):
+    """NumPy int64 Buffers"""
+    dtype: type = numpy.int64
+
+    def zeros(self, size: int) -> numpy.ndarray:
+        return numpy.zeros(size, dtype=self.dtype)
+
+    def linear(self, size: int) -> numpy.ndarray:
+        return numpy.arange(1, size + 1, dtype=self.dtype)
+
+    def convert(self, nums: Iterable[int]) -> numpy.ndarray:
+        return numpy.fromiter(nums, dtype=self.dtype)
+
+
+@dataclass
+class NumpyInt32Storage(NumpyStorage):
+    """NumPy int32 Buffers"""
+    dtype: type = numpy.int32
+
+
+storages = [ListStorage, NumpyStorage, NumpyInt32Storage]
@@ -0,0 +1,233 @@
+from dataclasses import dataclass
+import numpy
+
+TABLE_BITS = 12
+TABLE_SIZE = 1 << TABLE_BITS
+"""Samples in one cycle of every `Waveform`."""
+
+PHASE_BITS = 32
+# Phases are fixed point fractions of a cycle, in `uint32`s,
+# so they wrap around on their own, and their top `TABLE_BITS` bits are the index in the table.
+
+
+class Waveform:
+    """
+    One cycle of a periodic wave, precomputed as a table of `TABLE_SIZE` samples,
+    so voices only have to look samples up instead of computing them.
+
+    Tables are made by adding up the harmonics in `self.amplitudes`,
+    which are cut off after `self.harmonics`, so high notes don't alias too much.
+    """
+    harmonics: int = 32
+
+    def __init__(self):
+        positions = numpy.arange(TABLE_SIZE) / TABLE_SIZE
+        harmonics = numpy.arange(1, self.harmonics + 1)
+
+        table = self.amplitudes(harmonics) @ numpy.sin(2 * numpy.pi * harmonics[:, None] * positions)
+        table /= numpy.abs(table).max()
+
+        self.table: numpy.ndarray = table
+
+    def amplitudes(self, harmonics: numpy.ndarray) -> numpy.ndarray:
+        """Returns the amplitude of each of `harmonics` (1 being the fundamental) in the wave."""
+        raise NotImplementedError("Waveform is abstract.")
+
+
+class SineWaveform(Waveform):
+    """Sine"""
+    def amplitudes(self, harmonics: numpy.ndarray) -> numpy.ndarray:
+        return (harmonics == 1).astype(float)
+
+
+class SquareWaveform(Waveform):
+    """Square"""
+    def amplitudes(self, harmonics: numpy.ndarray) -> numpy.ndarray:
+        return (harmonics % 2) / harmonics
+
+
+class SawWaveform(Waveform):
+    """Saw"""
+    def amplitudes(self, harmonics: numpy.ndarray) -> numpy.ndarray:
+        return 1 / harmonics
+
+
+class TriangleWaveform(Waveform):
+    """Triangle"""
+    def amplitudes(self, harmonics: numpy.ndarray) -> numpy.ndarray:
+        return (harmonics % 2) * numpy.where(harmonics % 4 == 1, 1, -1) / harmonics ** 2
+
+
+waveforms = [SineWaveform, SquareWaveform, SawWaveform, TriangleWaveform]
+
+
+def note_frequencies(nums: numpy.ndarray, main_array_len: int, octaves: int, lowest: float) -> numpy.ndarray:
+    """Returns the nums as frequencies in an equal temperament scale from `lowest` and with `octaves` octaves."""
+    return lowest * (2 ** octaves) ** (nums / max(main_array_len, 1))
+
+
+def note_duration(samplerate: float, speed: float, minimum_duration: float) -> float:
+    """
+    Duration of each note in frames, at `speed` steps per second.
+    Decreases linearly with the delay between steps: one second (`samplerate` frames)
+    at 1 step per second or slower, down to `minimum_duration` frames.
+    """
+    delay = min(1.0, 1 / speed)
+    return (samplerate - minimum_duration) * delay + minimum_duration
+
+
+@dataclass
+class PitchTable:
+    """The phase increment (in fixed point cycles per frame) of every num in `range(main_array_len + 1)`."""
+    main_array_len: int
+    octaves: int
+    lowest: float
+    samplerate: float
+    increments: numpy.ndarray
+
+    @classmethod
+    def build(cls, main_array_len: int, octaves: int, lowest: float, samplerate: float) -> "PitchTable":
+        frequencies = note_frequencies(numpy.arange(main_array_len + 1), main_array_len, octaves, lowest)
+        increments = numpy.round(frequencies / samplerate * 2 ** PHASE_BITS).astype(numpy.uint32)
+        return cls(main_array_len, octaves, lowest, samplerate, increments)
+
+    def matches(self, main_array_len: int, octaves: int, lowest: float, samplerate: float) -> bool:
+        return (self.main_array_len, self.octaves, self.lowest, self.samplerate) == (main_array_len, octaves, lowest, samplerate)
+
+    def note_increments(self, nums: numpy.ndarray) -> numpy.ndarray:
+        """Returns the phase increment of each of `nums`, clipping nums outside the table to its ends."""
+        return self.increments[numpy.clip(nums, 0, self.main_array_len)]
+
+
+class Voices:
+    """
+    The notes being played, as arrays with one entry per voice,
+    so a whole block of audio is made with one NumPy expression across all of them
+    instead of a Python loop over every frame of every note.
+
+    Each voice keeps its own phase (see `PHASE_BITS`), carried over from one block to the next,
+    and its age (in frames), which its fade out is computed from.
+    Voices with negative ages start that many frames into the next block.
+    Samples are looked up in the table of `self.waveform`.
+
+    The arrays are a pool of `max_voices` voices, allocated once, and the first `self.count` are playing.
+    At most `self.limit` voices play at once: when more notes start, the oldest voices
+    (which are also the quietest, since every note fades out the same way) are stolen.
+    Notes are grouped into buckets `merge_cents` wide, and only one note of each bucket plays at once.
+    """
+
+    def __init__(self, max_voices: int = 256, merge_cents: float = 5, waveform: Waveform | None = None):
+        self.waveform: Waveform = waveform if waveform is not None else SineWaveform()
+
+        self.max_voices = max_voices
+        self.limit = max_voices
+        """How many voices can play at once. Can be lowered (down to 1) when rendering takes too long."""
+        self.merge_octaves = merge_cents / 1200
+        # Width of the buckets of notes that are merged.
+
+        self.increments = numpy.zeros(max_voices, dtype=numpy.uint32)
+        self.phases = numpy.zeros(max_voices, dtype=numpy.uint32)
+        self.ages = numpy.zeros(max_voices, dtype=numpy.int64)
+        self.count = 0
+
+        self.stolen = 0
+        self.merged = 0
+        # Notes that were cut short or never played, for statistics.
+
+    def __len__(self) -> int:
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def start(self, increments: numpy.ndarray, offsets: numpy.ndarray | None = None):
+        """
+        Starts a note for each of `increments` (see `PitchTable`) that isn't playing already,
+        `offsets` frames into the next block (right away if not given).
+        Repeated notes start at their earliest offset.
+
+        Also steals voices until there are at most `self.limit`.
+        """
+        if offsets is None:
+            offsets = numpy.zeros(len(increments), dtype=numpy.int64)
+
+        count = self.count
+        started = len(increments)
+
+        span = int(offsets.max()) + 1 if started else 1
+        keys = numpy.sort(increments.astype(numpy.uint64) * span + offsets.astype(numpy.uint64))
+        increments, offsets = (keys // span).astype(numpy.uint32), (keys % span).astype(numpy.int64)
+        # Sorted by note, then by offset (faster than `numpy.unique` with `return_index`).
+
+        buckets = self.buckets(increments)
+        new = numpy.ones(started, dtype=bool)
+        new[1:] = buckets[1:] != buckets[:-1]
+        # The lowest note of each bucket (at its earliest offset) stands for the whole bucket.
+
+        if count:
+            playing_buckets = numpy.sort(self.buckets(self.increments[:count]))
+            found = numpy.minimum(numpy.searchsorted(playing_buckets, buckets), count - 1)
+
+            new &= playing_buckets[found] != buckets
+        # A note that's still playing keeps going, instead of starting over.
+
+        increments, offsets = increments[new], offsets[new]
+        self.merged += started - len(increments)
+
+        total = count + len(increments)
+        all_increments = numpy.concatenate((self.increments[:count], increments))
+        all_phases = numpy.concatenate((self.phases[:count], -(increments * offsets.astype(numpy.uint32))))
+        all_ages = numpy.concatenate((self.ages[:count], -offsets.astype(numpy.int64)))
+        # Notes that start later in the block are younger than new, and their phase is 0 when they start.
+
+        limit = max(1, min(self.limit, self.max_voices))
+        if total > limit:
+            youngest = numpy.argpartition(all_ages, limit - 1)[:limit]
+            all_increments, all_phases, all_ages = all_increments[youngest], all_phases[youngest], all_ages[youngest]
+
+            self.stolen += total - limit
+            total = limit
+
+        self.increments[:total] = all_increments
+        self.phases[:total] = all_phases
+        self.ages[:total] = all_ages
+        self.count = total
+
+    def buckets(self, increments: numpy.ndarray) -> numpy.ndarray:
+        """Returns the bucket of merged notes each of `increments` is in."""
+        return numpy.floor(numpy.log2(numpy.maximum(increments, 1)) / self.merge_octaves).astype(numpy.int64)
+
+    def render(self, frames: int, duration: float) -> numpy.ndarray:
+        """
+        Returns the next `frames` frames of all the voices added together,
+        each fading out linearly over `duration` frames,
+        and drops the voices that faded out.
+        """
+        count = self.count
+        increments, phases, ages = self.increments[:count], self.phases[:count], self.ages[:count]
+        offsets = numpy.arange(frames, dtype=numpy.uint32)
+
+        positions = phases[:, None] + increments[:, None] * offsets
+        samples = self.waveform.table[positions >> (PHASE_BITS - TABLE_BITS)]
+        # (voices, frames)
+
+        partial = (ages < 0) | (ages + frames > duration)
+        if partial.any():
+            partial_ages = ages[partial, None] + offsets
+            samples[partial] *= (partial_ages >= 0) & (partial_ages < duration)
+        # Voices that start or fade out during this block are silent before or after that.
+
+        block = (duration - ages) / duration @ samples - offsets / duration * samples.sum(axis=0)
+        # Each voice's envelope is `(duration - age - offset) / duration`,
+        # so it's applied as its start level times its samples, minus a ramp shared by every voice.
+
+        phases += increments * numpy.uint32(frames)
+        ages += frames
+
+        playing = numpy.flatnonzero(ages < duration)
+        self.count = len(playing)
+        self.increments[:self.count] = increments[playing]
+        self.phases[:self.count] = phases[playing]
+        self.ages[:self.count] = ages[playing]
+
+        return block
@@ -0,0 +1,164 @@
+"""
+Compact binary traces of the operations done in a `SortPlayground`.
+
+A trace file starts with `MAGIC`, followed by fixed-width records
+of `RECORD_LEN` native ints each (int32's, except for `value`, which is an int64, since nums can be):
+
+    (opcode, array, index, other_array, other_index, value)
+
+Fields an operation doesn't use are 0.
+`read_trace` maps a trace file as a NumPy array of `RECORD_DTYPE`,
+without loading it into memory.
+"""
+from array import array
+from typing import BinaryIO, Iterable
+import numpy
+
+Opcode = int
+
+OP_READ: Opcode = 0
+"""(array, index) was read, and had `value`."""
+OP_WRITE: Opcode = 1
+"""`value` was written at (array, index)."""
+OP_INCREMENT: Opcode = 2
+"""(array, index) was incremented by `value`."""
+OP_SWAP: Opcode = 3
+"""(array, index) and (other_array, other_index) were swapped."""
+OP_COMPARE: Opcode = 4
+"""(array, index) and (other_array, other_index) were compared, and `value` is the result (0 or 1)."""
+OP_SPAWN: Opcode = 5
+"""A new array of `value` zeros was appended, and its index is `array`."""
+OP_DELETE: Opcode = 6
+"""The array at `array` was deleted."""
+OP_LOAD: Opcode = 7
+"""
+`value` was at (array, index) when the recording started.
+Not an operation of the algorithms, and not counted in the statistics.
+"""
+OP_LOAD_ARRAY: Opcode = 8
+"""
+The array at `array` was replaced (or appended, if it didn't exist) with an array of length `value`,
+when the recording started or the main array's length changed.
+Its nums are set by the `OP_LOAD`'s after it. Not counted in the statistics.
+"""
+OP_ITER: Opcode = 9
+"""(array, index) was read by `SortPlayground.array_iter`, and had `value`. Not counted in the statistics."""
+OP_RESET: Opcode = 10
+"""`SortPlayground.reset` was called: every array but the main one was deleted, and the statistics were reset."""
+
+OPCODE_NAMES: dict[Opcode, str] = {
+    OP_READ: "read",
+    OP_WRITE: "write",
+    OP_INCREMENT: "increment",
+    OP_SWAP: "swap",
+    OP_COMPARE: "compare",
+    OP_SPAWN: "spawn",
+    OP_DELETE: "delete",
+    OP_LOAD: "load",
+    OP_LOAD_ARRAY: "load array",
+    OP_ITER: "iter",
+    OP_RESET: "reset",
+}
+
+MAGIC = b"SORTTRC2"
+# Version 1 stored values as int32's.
+
+RECORD_LEN = 6
+RECORD_DTYPE = numpy.dtype([
+    ("opcode", numpy.intc),
+    ("array", numpy.intc),
+    ("index", numpy.intc),
+    ("other_array", numpy.intc),
+    ("other_index", numpy.intc),
+    ("value", numpy.int64),
+])
+# Packed, without padding.
+
+
+class TraceRecorder:
+    """
+    Appends records to an in-memory chunk,
+    and writes the chunk to `file` each time it holds `chunk_records` records,
+    so long runs never keep the whole trace in memory.
+
+    Given to a `SortPlayground` through `SortPlayground.start_recording`.
+    """
+
+    def __init__(self, file: str | BinaryIO, chunk_records: int = 1 << 16):
+        self.owns_file = isinstance(file, str)
+        self.file: BinaryIO = open(file, "wb") if self.owns_file else file
+        self.file.write(MAGIC)
+
+        self.chunk = array("q")
+        # Every field as an int64, since `array` can't mix types, and packed into records when flushed.
+        self.chunk_len = chunk_records * RECORD_LEN
+
+        self.records = 0
+        """Amount of records written so far (flushed or not)."""
+
+    def record(self, opcode: Opcode, array_index: int, index: int,
+               other_array_index: int = 0, other_index: int = 0, value: int = 0):
+        self.chunk.extend((opcode, array_index, index, other_array_index, other_index, value))
+        self.records += 1
+
+        if len(self.chunk) >= self.chunk_len:
+            self.flush()
+
+    def record_all(self, records: numpy.ndarray):
+        """Records all of `records` (of `RECORD_DTYPE`) at once."""
+        self.flush()
+        self.file.write(records.tobytes())
+        self.records += len(records)
+
+    def load(self, array_index: int, nums: Iterable[int]):
+        """Records an `OP_LOAD_ARRAY` for the array at `array_index`, then an `OP_LOAD` for each of its nums."""
+        nums = numpy.fromiter(nums, dtype=numpy.int64)
+
+        self.record(OP_LOAD_ARRAY, array_index, 0, value=len(nums))
+        self.flush()
+
+        records = numpy.zeros(len(nums), dtype=RECORD_DTYPE)
+        records["opcode"] = OP_LOAD
+        records["array"] = array_index
+        records["index"] = numpy.arange(len(nums))
+        records["value"] = nums
+        self.record_all(records)
+
+    def flush(self):
+        """Writes the current chunk to the file, so it can be read while recording."""
+        if self.chunk:
+            fields = numpy.frombuffer(self.chunk, dtype=numpy.int64).reshape(-1, RECORD_LEN)
+            records = numpy.zeros(len(fields), dtype=RECORD_DTYPE)
+            for column, name in enumerate(RECORD_DTYPE.names):
+                records[name] = fields[:, column]
+
+            fields = None
+            # The chunk can't be resized while it's viewed.
+            self.file.write(records.tobytes())
+            del self.chunk[:]
+
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        if self.owns_file:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_trace(path: str) -> numpy.ndarray:
+    """Maps the trace file at `path` as a read-only array of `RECORD_DTYPE` records."""
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"'{path}' is not a trace file (or was recorded by an older version).")
+
+        if not file.read(1):
+            return numpy.zeros(0, dtype=RECORD_DTYPE)
+        # Empty files can't be mapped.
+
+    return numpy.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=len(MAGIC))
@@ -2,42 +2,70 @@ import tkinter
 import sounddevice
 import numpy
 # for audio
-from threading import Thread
-from time import sleep
+from threading import Thread, Condition, Lock
+from multiprocessing import Process, Pipe
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from concurrent.futures import Future
+from collections import deque
+from time import perf_counter
 # for core
 from algorithms import *
+from algorithms.replay import Replay
+from algorithms.snapshot import Snapshot
+from algorithms.shared import (SharedMemoryStorage, SharedDirtyTracker, SharedPlayground,
+                               HEADER_DTYPE, array_layout, write_header, read_header)
+from algorithms.dirty import DirtyReader, ranges
+from algorithms.events import AccessEvents, EVENTS_CAPACITY
+from algorithms.synth import Voices, PitchTable, note_frequencies, note_duration, waveforms
 from itertools import chain
+from tempfile import mkstemp
+import os
+import argparse
 # for controlling core
-from colorsys import hsv_to_rgb
 # for display
 from collections.abc import Iterable, Callable
+from bisect import bisect_left
 
 
-def rainbow_color(num: int, max_num: int):
-    try:
-        hue = num / max_num
-    except ZeroDivisionError:
-        hue = 0
-
-    r, g, b = hsv_to_rgb(hue, 1, 1)
+def update_replay(replay: Replay | None, trace_path: str, main_array_len: int) -> Replay:
+    """Returns `replay` updated with the records in `trace_path` (or a new replay of them, if `replay` is None)."""
+    records = read_trace(trace_path)
 
-    r = int(r * 255)
-    g = int(g * 255)
-    b = int(b * 255)
+    if replay is None or len(records) < len(replay):
+        return Replay(records, keyframe_interval=max(4096, main_array_len))
+        # Keyframes copy every array, so big arrays get fewer of them.
 
-    return '#%02x%02x%02x' % (r, g, b)
+    replay.update(records)
+    # Only the records that are new since the last call need keyframes.
+    return replay
 
 
 class SortControl(Thread, SortPlayground):
     """Container for all sorts, settings and shuffles.
     Runs loop with algorithm coroutines during the main window mainloop.
-    Controls playing and pausing."""
+    Controls playing and pausing.
+
+    Its methods should only be called from its own thread.
+    Other threads (like the UI) `send` them as commands,
+    which run between steps, and read `self.snapshot` instead of the arrays."""
 
-    def __init__(self, main_array_len: int, delay: float):
+    def __init__(self, main_array_len: int, speed: float, storage: Storage | None = None, record: bool = False):
         Thread.__init__(self)
-        SortPlayground.__init__(self, main_array_len)
+        SortPlayground.__init__(self, main_array_len, storage if storage is not None else ListStorage())
+        # Python lists are faster to index one element at a time, which is all the UI does.
 
-        self.delay = delay
+        self.events = AccessEvents()
+        # Every access is heard by the audio, even between its callbacks.
+        self.step_duration: float = 0
+        # How long steps took in the last batch that ran out of time, in seconds.
+
+        self.speed = speed
+        """Steps per second."""
+        self.tick = 0.01
+        # in seconds
+        # Steps run in batches, each taking up to one tick,
+        # so the speed isn't limited by how precisely the thread can sleep.
 
         self.sort_classes: dict[str, Algorithm] = {sort_cls.__doc__: sort_cls for sort_cls in sorts}
         self.chosen_sort: Algorithm = BubbleSort(self)
@@ -46,17 +74,37 @@ class SortControl(Thread, SortPlayground):
         self.shuffle_classes: dict[str, Algorithm] = {shuffle_cls.__doc__: shuffle_cls for shuffle_cls in shuffles}
         self.chosen_shuffle: Algorithm = Shuffle(self)
         self.verify_algorithm = Verify(self)
+        self.storage_classes: dict[str, Storage] = {storage_cls.__doc__: storage_cls for storage_cls in storages}
         # Settings chosen by UI.
 
         self.chosen_algorithms: Iterable[None] = iter(())
         # chain of all chosen algorithms
-        self.reset()
-        # define chain
+
+        self.record = record
+        self.trace_path: str | None = None
+        self.cached_replay: Replay | None = None
+        # While `self.record` is on, each run is recorded into a temporary trace file, so it can be replayed.
+        # It's off unless asked for, since recording slows the algorithms down, and the trace grows with every step.
 
         self.exited = False
         self.playing = False
+        self.finished = False
         # data
 
+        self.commands: deque[tuple[Callable, tuple, Future]] = deque()
+        self.condition = Condition()
+        # Notified when a command is sent, so a paused thread wakes up to run it.
+
+        self.start_publishing()
+
+        self.reset()
+        # define chain
+
+    def start_publishing(self):
+        """Builds what `self.publish` updates for other threads to read."""
+        self.snapshot = Snapshot(self)
+        """A copy of the playground, updated after each batch of steps, for other threads to read."""
+
     def reset(self):
         """Resets self.chosen_algorithms and resets self as SortPlayground."""
         self.chosen_algorithms = chain(self.chosen_input.run(),
@@ -64,17 +112,119 @@ class SortControl(Thread, SortPlayground):
                                        self.chosen_sort.run(),
                                        self.verify_algorithm.run())
         SortPlayground.reset(self)
+        self.finished = False
+
+        if self.record:
+            self.restart_recording()
+
+    def discard_recording(self):
+        """Stops recording, and deletes the trace file."""
+        recorder = self.stop_recording()
+        if recorder is not None:
+            recorder.close()
+            os.remove(self.trace_path)
+
+        self.cached_replay = None
+
+    def restart_recording(self):
+        """Records from now on into a new trace file, and deletes the previous one."""
+        self.discard_recording()
+
+        file_descriptor, self.trace_path = mkstemp(suffix=".trace")
+        os.close(file_descriptor)
+
+        self.start_recording(TraceRecorder(self.trace_path))
+
+    def change_recording(self, record: bool):
+        """
+        Turns recording runs on or off.
+        Turned on in the middle of a run, the rest of it is recorded, starting from its current arrays.
+        """
+        self.record = record
+
+        if not record:
+            self.discard_recording()
+        elif self.recorder is None:
+            self.restart_recording()
+
+    def replay(self) -> Replay | None:
+        """
+        Returns the current run, as recorded so far, ready to seek through.
+        Returns None if runs aren't being recorded.
+
+        Should only be called while paused.
+        """
+        if self.recorder is None:
+            return None
+
+        self.recorder.flush()
+        self.cached_replay = update_replay(self.cached_replay, self.trace_path, self.main_array_len)
+
+        return self.cached_replay
+
+    def request_replay(self) -> Replay | None:
+        """Pauses the run and returns `self.replay()`. Called from other threads."""
+        self.send(SortControl.pause)
+        return self.send(SortControl.replay).result()
+        # Commands run in order, so the run is paused before it's read.
+
+    @property
+    def recorded_steps(self) -> int | None:
+        """How many records the current run's trace has, or None if it isn't recorded."""
+        recorder = self.recorder
+        # Read once, since a new run replaces it.
+        return recorder.records if recorder is not None else None
+
+    def publish(self) -> bool:
+        """Makes the current state visible to other threads. Returns False if it has to be tried again later."""
+        return self.snapshot.publish()
 
     def stop(self):
         self.playing = False
         self.reset()
         # To refresh coroutines when they amount.
 
+    def send(self, command: Callable, *args) -> Future:
+        """
+        Makes this thread call `command(self, *args)` between steps (`command` is a method, like `SortControl.stop`).
+        Returns a future of its result.
+        """
+        future = Future()
+
+        with self.condition:
+            self.commands.append((command, args, future))
+            self.condition.notify()
+
+        return future
+
+    def run_commands(self):
+        with self.condition:
+            commands = list(self.commands)
+            self.commands.clear()
+
+        for command, args, future in commands:
+            try:
+                future.set_result(command(self, *args))
+            except Exception as exception:
+                future.set_exception(exception)
+
+    def pause(self):
+        self.playing = False
+
     def pause_play(self):
+        if self.finished:
+            self.stop()
+            # Play the run again from the start.
+
         self.playing = not self.playing
 
-    def change_delay(self, s: float):
-        self.delay = s
+    @property
+    def delay(self) -> float:
+        """Average time between steps, in seconds (at most 1)."""
+        return min(1.0, 1 / self.speed)
+
+    def change_speed(self, speed: float):
+        self.speed = speed
 
     def choose_input(self, name: str, options: dict[str, object] | None):
         if not (name in self.input_classes):
@@ -121,24 +271,383 @@ class SortControl(Thread, SortPlayground):
         self.stop()
         # restart
 
+    def choose_storage(self, name: str):
+        if not (name in self.storage_classes):
+            raise KeyError(f"Storage '{name}' doesn't exist.")
+
+        self.change_storage(self.storage_classes[name]())
+
+        self.stop()
+        # restart
+
     def exit(self):
-        self.exited = True
+        with self.condition:
+            self.exited = True
+            self.condition.notify()
+
+    def run_steps(self, steps: int, deadline: float) -> int:
+        """
+        Runs up to `steps` steps of the chosen algorithms, stopping early at `deadline` (a `perf_counter` time).
+        Returns how many steps were run.
+
+        Each step's events are timed as if the steps were spread evenly at `self.speed`
+        (starting from `self.events.time`), instead of with the time they actually ran at, in bursts.
+        """
+        events = self.events
+        interval = max(1 / self.speed, self.step_duration)
+        # When the algorithms can't keep up, steps are spread over the time they really take,
+        # so their events don't fall further and further behind.
+        started = perf_counter()
+
+        for step in range(steps):
+            if not step & 255:
+                events.commit()
+                now = perf_counter()
+
+                if now >= deadline:
+                    self.step_duration = (now - started) / max(step, 1)
+                    return step
+            # Checking the clock every step would slow the algorithms down.
+
+            events.time += interval
+
+            try:
+                next(self.chosen_algorithms)
+            except StopIteration:
+                self.playing = False
+                self.finished = True
+                # Keep the finished run on screen (and recorded), until played again.
+                return steps
+
+        self.step_duration = 0
+        return steps
 
     def run(self):
+        owed_steps: float = 0
+        # Steps that are due, but haven't been run yet.
+        last_tick = perf_counter()
+
         while not self.exited:
+            self.run_commands()
+            tick_start = perf_counter()
 
             if self.playing:
-                try:
-                    next(self.chosen_algorithms)
-                except StopIteration:
-                    self.stop()
+                owed_steps = min(owed_steps + (tick_start - last_tick) * self.speed, 2 * self.speed * self.tick + 1)
+                # Steps that didn't fit in their tick are dropped instead of piling up,
+                # so the speed goes back to normal as soon as the algorithms can keep up.
+                # (Up to two ticks' worth are kept, for ticks that start a little late.)
 
-            sleep(self.delay)
+                self.events.time = max(tick_start - owed_steps / self.speed, tick_start - self.tick)
+                # When the first owed step was due (steps owed for longer than a tick are dropped anyway).
+
+                owed_steps -= self.run_steps(int(owed_steps), tick_start + self.tick)
+                self.events.commit()
+            else:
+                owed_steps = 0
+
+            last_tick = tick_start
+            published = self.publish()
+
+            with self.condition:
+                if self.commands or self.exited:
+                    continue
+
+                if self.playing or not published:
+                    self.condition.wait(max(0.0, tick_start + self.tick - perf_counter()))
+                else:
+                    self.condition.wait()
+                    # Paused, and everything is on screen: sleep until a command arrives.
+
+        self.discard_recording()
+
+
+class EngineSortControl(SortControl):
+    """
+    The `SortControl` of a `ProcessSortControl`, running in its child process (see `run_engine`).
+
+    Its arrays and dirty stamps are built in shared memory, and instead of a `Snapshot`,
+    it publishes its pointers and statistics in a shared header (see `algorithms.shared`),
+    and sends the layout of its arrays and its named pointers through `connection` when they change.
+    Commands arrive through `connection` as well.
+    """
+
+    def __init__(self, connection: Connection, header_name: str, events_name: str,
+                 main_array_len: int, speed: float, record: bool = False):
+        self.connection = connection
+        self.connection_lock = Lock()
+        # Replies to commands are sent from other threads than publications.
+
+        self.header_block = SharedMemory(header_name)
+        self.header: numpy.ndarray = numpy.ndarray((), dtype=HEADER_DTYPE, buffer=self.header_block.buf)
+
+        SortControl.__init__(self, main_array_len, speed, SharedMemoryStorage(), record)
+        self.storage_classes = {SharedMemoryStorage.__doc__: SharedMemoryStorage}
+
+        self.events_block = SharedMemory(events_name)
+        self.events = AccessEvents(buffer=self.events_block.buf)
+
+        self.sent_layout_epoch: int | None = None
+        self.sent_named_pointers: dict[str, Pointer] | None = None
+
+    def start_publishing(self):
+        self.dirty = SharedDirtyTracker(self.arrays, self.storage)
+        # The other process reads the stamps, instead of a `Snapshot` of this playground.
+
+    def post(self, message: tuple):
+        with self.connection_lock:
+            self.connection.send(message)
+
+    def receive_commands(self):
+        """Sends every command received through `self.connection` to this thread, until the connection closes."""
+        while True:
+            try:
+                request_id, command_name, args = self.connection.recv()
+            except EOFError:
+                self.exit()
+                return
+
+            future = self.send(getattr(type(self), command_name), *args)
+            future.add_done_callback(lambda future, request_id=request_id: self.post_result(request_id, future))
+
+    def post_result(self, request_id: int, future: Future):
+        exception = future.exception()
+        self.post(("result", request_id, None if exception is not None else future.result(), exception))
+
+    def choose_storage(self, name: str):
+        self.stop()
+        # There's only one storage: the one whose blocks the other process maps.
+
+    def flush_trace(self) -> str | None:
+        """Makes the current run's trace file complete so far, and returns its path (or None if it isn't recorded)."""
+        if self.recorder is None:
+            return None
+
+        self.recorder.flush()
+        return self.trace_path
+
+    def publish(self) -> bool:
+        if self.dirty.layout_epoch != self.sent_layout_epoch:
+            self.post(("layout", self.dirty.layout_epoch, array_layout(self)))
+            self.sent_layout_epoch = self.dirty.layout_epoch
+
+            self.storage.release([*self.arrays, *self.dirty.stamps, *self.dirty.block_stamps])
+
+        if self.named_pointers != self.sent_named_pointers:
+            self.sent_named_pointers = self.named_pointers.copy()
+            self.post(("named pointers", self.sent_named_pointers))
+
+        recorded_steps = self.recorded_steps
+        write_header(self.header, self,
+                     playing=self.playing,
+                     finished=self.finished,
+                     recorded_steps=recorded_steps if recorded_steps is not None else -1,
+                     speed=self.speed)
+        self.post(("published",))
+
+        self.dirty.epoch += 1
+        # Writes from now on belong to the next publication.
+        return True
+
+
+def run_engine(connection: Connection, header_name: str, events_name: str, main_array_len: int, speed: float, record: bool):
+    """Entry point of the child process of a `ProcessSortControl`."""
+    engine = EngineSortControl(connection, header_name, events_name, main_array_len, speed, record)
+    Thread(target=engine.receive_commands, daemon=True).start()
+
+    try:
+        engine.run()
+    finally:
+        engine.arrays = []
+        engine.dirty.stamps = []
+        engine.dirty.block_stamps = []
+        engine.storage.close()
+        engine.header = None
+        engine.header_block.close()
+        engine.events = None
+        engine.events_block.close()
+        connection.close()
+
+
+class ProcessSortControl(Thread):
+    """
+    Runs a `SortControl` (an `EngineSortControl`) in a child process,
+    so the algorithms don't compete with the UI and the audio for the GIL.
+
+    Has the same interface the UI uses from `SortControl`:
+    commands are sent to the child process, and `self.snapshot` is a `SharedPlayground`
+    that maps the child's arrays directly. This thread receives the child's replies and publications.
+    Its pointers are limited to the first `algorithms.shared.REGISTER_SLOTS` of each operation.
+    """
+
+    def __init__(self, main_array_len: int, speed: float, record: bool = False):
+        Thread.__init__(self, daemon=True)
+
+        self.header_block = SharedMemory(create=True, size=HEADER_DTYPE.itemsize)
+        # Created before starting the child, so both processes share the same resource tracker.
+        self.header: numpy.ndarray = numpy.ndarray((), dtype=HEADER_DTYPE, buffer=self.header_block.buf)
+        self.header["recorded_steps"] = -1
+        self.header["speed"] = speed
+        self.latest_header: numpy.ndarray = read_header(self.header)
+
+        self.events_block = SharedMemory(create=True, size=AccessEvents.size(EVENTS_CAPACITY))
+        self.events = AccessEvents(buffer=self.events_block.buf)
+        self.events.head[0] = 0
+        # The child pushes every access, and the audio drains them here.
+
+        self.connection, child_connection = Pipe()
+        self.process = Process(target=run_engine,
+                               args=(child_connection, self.header_block.name, self.events_block.name,
+                                     main_array_len, speed, record),
+                               daemon=True)
+
+        self.snapshot = SharedPlayground()
+
+        self.futures: dict[int, Future] = {}
+        self.next_request_id = 0
+        self.send_lock = Lock()
+
+        self.cached_replay: Replay | None = None
+        self.cached_trace_path: str | None = None
+
+        self.sort_classes: dict[str, Algorithm] = {sort_cls.__doc__: sort_cls for sort_cls in sorts}
+        self.chosen_sort: Algorithm = BubbleSort(self)
+        self.input_classes: dict[str, Algorithm] = {input_cls.__doc__: input_cls for input_cls in inputs}
+        self.chosen_input: Algorithm = Linear(self)
+        self.shuffle_classes: dict[str, Algorithm] = {shuffle_cls.__doc__: shuffle_cls for shuffle_cls in shuffles}
+        self.chosen_shuffle: Algorithm = Shuffle(self)
+        self.storage: Storage = SharedMemoryStorage()
+        self.storage_classes: dict[str, Storage] = {SharedMemoryStorage.__doc__: SharedMemoryStorage}
+        self.initial_main_array_len = main_array_len
+        # Same as `SortControl`'s defaults, for the UI's menus.
+
+    @property
+    def playing(self) -> bool:
+        return bool(self.latest_header["playing"])
+
+    @property
+    def finished(self) -> bool:
+        return bool(self.latest_header["finished"])
+
+    @property
+    def speed(self) -> float:
+        return float(self.latest_header["speed"])
+
+    @property
+    def delay(self) -> float:
+        return min(1.0, 1 / self.speed)
+
+    @property
+    def recorded_steps(self) -> int | None:
+        recorded_steps = int(self.latest_header["recorded_steps"])
+        return recorded_steps if recorded_steps >= 0 else None
+
+    @property
+    def main_array_len(self) -> int:
+        arrays = self.snapshot.arrays
+        return len(arrays[0]) if arrays else self.initial_main_array_len
+
+    def start(self):
+        self.process.start()
+        Thread.start(self)
+
+    def send(self, command: Callable, *args) -> Future:
+        """Makes the child process run `command` (a method of `SortControl`, like `SortControl.stop`). Returns a future of its result."""
+        future = Future()
+
+        with self.send_lock:
+            request_id = self.next_request_id
+            self.next_request_id += 1
+            self.futures[request_id] = future
+
+            try:
+                self.connection.send((request_id, command.__name__, args))
+            except OSError as exception:
+                self.futures.pop(request_id)
+                future.set_exception(exception)
+            # The child process already exited.
+
+        return future
+
+    def request_replay(self) -> Replay | None:
+        self.send(SortControl.pause)
+        trace_path: str | None = self.send(EngineSortControl.flush_trace).result()
+
+        if trace_path is None:
+            return None
+
+        if trace_path != self.cached_trace_path:
+            self.cached_replay = None
+            self.cached_trace_path = trace_path
+        # A new run is recorded into a new file.
+
+        self.cached_replay = update_replay(self.cached_replay, trace_path, self.main_array_len)
+        return self.cached_replay
+
+    def run(self):
+        while True:
+            try:
+                message = self.connection.recv()
+            except (EOFError, OSError):
+                break
+
+            if message[0] == "result":
+                _, request_id, result, exception = message
+                future = self.futures.pop(request_id)
+
+                if exception is not None:
+                    future.set_exception(exception)
+                else:
+                    future.set_result(result)
+            elif message[0] == "layout":
+                _, layout_epoch, layout = message
+
+                with self.snapshot.lock:
+                    try:
+                        self.snapshot.apply_layout(layout_epoch, layout)
+                    except FileNotFoundError:
+                        pass
+                    # The arrays were already replaced, and a newer layout is on its way.
+            elif message[0] == "named pointers":
+                with self.snapshot.lock:
+                    self.snapshot.named_pointers = message[1]
+            elif message[0] == "published":
+                header = read_header(self.header)
+
+                with self.snapshot.lock:
+                    if self.snapshot.apply_header(header):
+                        self.latest_header = header
+
+        with self.send_lock:
+            for future in self.futures.values():
+                future.set_exception(EOFError("The engine process exited."))
+            self.futures.clear()
+
+    def exit(self):
+        self.send(SortControl.exit)
+
+    def join(self, timeout: float | None = None):
+        self.process.join(timeout)
+        Thread.join(self, timeout)
+
+        with self.snapshot.lock:
+            self.snapshot.close()
+
+        self.header = None
+        self.latest_header = None
+        self.header_block.close()
+        self.header_block.unlink()
+        self.events = None
+        self.events_block.close()
+        self.events_block.unlink()
 
 
 class AudioControl(sounddevice.OutputStream):
     """OutputStream of frequencies representing nums in SortControl"""
-    def __init__(self, sort_control: SortControl, octaves: int):
+
+    histogram_bounds: tuple[float, ...] = (5, 10, 25, 50, 75, 100, 200)
+    """Upper bounds (in percent of the block's duration) of each bucket of `self.histogram`. The last bucket has no bound."""
+
+    def __init__(self, sort_control: SortControl, octaves: int, max_voices: int = 256):
         self.lowest = 210
         sounddevice.OutputStream.__init__(self, blocksize=self.lowest, channels=1, callback=self.callback)
         # 210 divides 44100 evenly.
@@ -148,8 +657,29 @@ class AudioControl(sounddevice.OutputStream):
 
         self.octaves = octaves
 
-        self.frequencies = {}
-        # frequency: start_index
+        self.voices = Voices(max_voices)
+        self.min_voices = 8
+        # The voice limit goes down (to this at least) when callbacks get close to their deadline,
+        # and back up when they have time to spare.
+        self.pitch_table = PitchTable.build(0, self.octaves, self.lowest, self.samplerate)
+
+        self.latency = 0.03
+        # in seconds
+        # Accesses are heard this long after they happen, since they're only
+        # committed after each batch of steps (see `SortControl.run_steps`).
+        self.block_time: float | None = None
+        # The time (in `perf_counter` seconds, minus `self.latency`) of the start of the next block.
+        self.pending_nums = numpy.zeros(0, dtype=numpy.int64)
+        self.pending_times = numpy.zeros(0)
+        # Accesses due in later blocks.
+
+        self.histogram: list[int] = [0] * (len(self.histogram_bounds) + 1)
+        """How many callbacks took each range of percentages of their block's duration (see `self.histogram_bounds`)."""
+        self.callbacks = 0
+        self.late_callbacks = 0
+        # Took longer than their block lasts.
+        self.underflows = 0
+        # Reported by sounddevice: the output ran dry.
 
         self.start()
 
@@ -167,63 +697,97 @@ class AudioControl(sounddevice.OutputStream):
         # 0 -> self.minimum_duration
         # Length of note decreases linearly: max is one second (self.samplerate samples)
         # and min is self.minimum_duration.
-        return (self.samplerate - self.minimum_duration) * self.sort_control.delay + self.minimum_duration
+        return note_duration(self.samplerate, self.sort_control.speed, self.minimum_duration)
 
     def frequency(self, num: int):
         """Returns the num as a frequency in an equal temperament scale
         from `self.lowest` and with `self.octaves` octaves."""
-        result = self.lowest * (2 ** self.octaves) ** (num / self.sort_control.main_array_len)
+        result = note_frequencies(num, self.sort_control.main_array_len, self.octaves, self.lowest)
         return result
 
-    def audify(self):
-        """Changes the current frequency played."""
-        if not self.sort_control.playing:
-            self.frequencies = {}
-            return
+    def note_increments(self, nums: numpy.ndarray) -> numpy.ndarray:
+        """Returns the phase increments (see `PitchTable`) of the frequencies of `nums`."""
+        key = (self.sort_control.main_array_len, self.octaves, self.lowest, self.samplerate)
 
-        # stopped, playing, frequencies, new_frequencies:
-        #   True     False      []             []
-        #   False    True       []            [...]
-        #   False    True      [...]          [...]
-        #   False    True      [...]           []
+        if not self.pitch_table.matches(*key):
+            self.pitch_table = PitchTable.build(*key)
+        # Only computed again when the length of the main array changed.
 
-        for num in self.sort_control.read_at_pointers():
-            frequency = self.frequency(num)
-            # To display the num as a proportional frequency
+        return self.pitch_table.note_increments(nums)
 
-            self.frequencies.setdefault(frequency, 0)
-            # Each frequency has a current index in the wave.
+    def audify(self, frames: int):
+        """Starts the notes of the accesses due in the next `frames` frames, at the frames they're due."""
+        nums, times = self.sort_control.events.drain()
 
-    def sine_waves(self, frames: int):
-        # frames of audio controller
-        """Returns sine_waves of all nums currently pointed at by self.sort_control
-        as added sine waves."""
-        result = numpy.zeros((frames, 1))
+        if not self.sort_control.playing:
+            self.voices.clear()
+            self.block_time = None
+            self.pending_nums = self.pending_nums[:0]
+            self.pending_times = self.pending_times[:0]
+            return
 
-        for frequency, start_index in self.frequencies.copy().items():
-            for frame_count in range(frames):
-                wave_index = start_index + frame_count
-                input_index = wave_index * 2 * numpy.pi * frequency / self.samplerate
+        nums = numpy.concatenate((self.pending_nums, nums))
+        times = numpy.concatenate((self.pending_times, times))
 
-                amplitude = (self.duration - wave_index) / self.duration
-                # each note fades out
+        block_length = frames / self.samplerate
+        now = perf_counter() - self.latency
 
-                result[frame_count] += amplitude * numpy.sin(input_index)
+        if self.block_time is None or abs(self.block_time - now) > self.latency:
+            self.block_time = now
+        # Blocks follow each other without gaps, unless the callbacks fell far behind (or were paused).
+        block_start = self.block_time
+        self.block_time += block_length
 
-                if amplitude <= 0:
-                    self.frequencies.pop(frequency)
-                    break
-            else:
-                self.frequencies[frequency] += frames
+        due = times < self.block_time
+        self.pending_nums, self.pending_times = nums[~due], times[~due]
 
-        return result
+        offsets = numpy.clip(((times[due] - block_start) * self.samplerate).astype(numpy.int64), 0, frames - 1)
+        # Accesses that are already late start right away.
+
+        self.voices.start(self.note_increments(nums[due]), offsets)
+
+    def sine_waves(self, frames: int):
+        # frames of audio controller
+        """Returns waves (of `self.voices.waveform`) of all nums recently accessed by self.sort_control
+        as added waves."""
+        return self.voices.render(frames, self.duration)[:, None]
 
     def callback(self, outdata: numpy.ndarray, frames: int, time, status) -> None:
         """writes sound output to 'outdata' Called by self in sounddevice.OutputStream."""
         # params may need annotations... :/
-        self.audify()
+        start = perf_counter()
+
+        self.audify(frames)
         outdata[:] = self.sine_waves(frames)
 
+        load = (perf_counter() - start) * self.samplerate / frames
+        # The callback's time, as a fraction of how long its block lasts (its deadline).
+        self.histogram[bisect_left(self.histogram_bounds, load * 100)] += 1
+        self.callbacks += 1
+        if load > 1:
+            self.late_callbacks += 1
+        if status.output_underflow:
+            self.underflows += 1
+
+        voices = self.voices
+        if load > 0.5:
+            voices.limit = max(self.min_voices, voices.limit * 3 // 4)
+        elif load < 0.25 and voices.count >= voices.limit:
+            voices.limit = min(voices.max_voices, voices.limit + max(1, voices.limit // 8))
+        # Backs off quickly, and only grows back while the limit is what's holding the voices back.
+
+    def __str__(self) -> str:
+        lines = [f"{self.callbacks} audio callbacks, {self.late_callbacks} past their deadline, {self.underflows} underflows",
+                 f"{self.voices.stolen} voices stolen, {self.voices.merged} notes merged, "
+                 f"voice limit {self.voices.limit}/{self.voices.max_voices}"]
+
+        lower_bound: float = 0
+        for upper_bound, count in zip((*self.histogram_bounds, float("inf")), self.histogram):
+            lines.append(f"{lower_bound:>4g} - {upper_bound:<4g}%: {count}")
+            lower_bound = upper_bound
+
+        return "\n".join(lines)
+
 
 # sort: Bubble Sort
 #       Radix Sort
@@ -390,20 +954,622 @@ class AlgorithmMenu:
             menu.pack()
 
 
+class Renderer:
+    """Renderer"""
+    # Draws a `SortPlayground` into a canvas.
+    # Subclasses draw the arrays (`self.draw_arrays`),
+    # and this class draws the named pointers and statistics on top of them,
+    # as canvas items that are created once, and then only moved/re-texted.
+
+    def __init__(self, canvas: tkinter.Canvas, palette: Palette | None = None):
+        self.canvas = canvas
+
+        self.palette: Palette = palette if palette is not None else RainbowPalette()
+        self.colors: ColorTable = self.palette.table(0)
+
+        self.playground: SortPlayground | None = None
+
+        self.layout: tuple = ()
+        """The canvas size and array lengths the arrays are currently laid out for."""
+
+        self.named_pointer_items: dict[str, tuple[int, int]] = {}
+        self.statistic_items: dict[str, tuple[int, str]] = {}
+
+        self.main_array_len: int = 0
+        self.canvas_height: int = 0
+        self.bar_width: float = 0
+        self.array_height: float = 0
+        self.named_pointers_space_height: float = 0
+        self.max_num_height: float = 0
+
+    def attach(self, playground: SortPlayground):
+        """Starts drawing `playground` instead of the previous one."""
+        self.playground = playground
+        self.layout = ()
+
+    def change_palette(self, palette: Palette):
+        self.palette = palette
+        self.layout = ()
+        # Everything gets drawn again, with the new colors.
+
+    def draw(self, playground: SortPlayground):
+        if playground is not self.playground:
+            self.attach(playground)
+
+        arrays = playground.arrays
+        if not arrays:
+            return
+        # Nothing was published yet.
+
+        layout = (self.canvas.winfo_width(), self.canvas.winfo_height(), tuple(len(array) for array in arrays))
+
+        relayout: bool = layout != self.layout
+        if relayout:
+            self.layout = layout
+            self.measure(arrays)
+
+        pointers: dict[Pointer, PointerType] = dict(playground.pointers.items())
+        # Only a couple of positions, read once per frame.
+
+        self.draw_arrays(arrays, pointers, relayout)
+        self.draw_named_pointers(playground)
+        self.draw_statistics(playground)
+
+    def measure(self, arrays: list):
+        """Calculates the sizes of everything, for `arrays` in the current `self.layout`."""
+        # I want to display each array taking equal space vertically, with
+        # the main array at the bottom, and each new extra array higher and higher.
+        # But, I want to display the pointers in `self.sort_control.named_pointers`
+        # in a space below each array, which would take some percent of the array's
+        # space at the bottom.
+        #
+        # Since there are `self.sort_control.array_count` arrays, and the canvas
+        # has height `self.canvas.winfo_height()`, each array's "height" should be
+        # self.canvas.winfo_height() / self.sort_control.array_count.
+        #
+        # I also want the max number in the main array to be the full height of the space
+        # the arrays are given to display their numbers, and every other number
+        # will have height proportional to the max number. The max number is they arrays'
+        # "height" minus the percent reserved for the named pointers.
+        canvas_width, self.canvas_height, _ = self.layout
+        self.main_array_len = len(arrays[0])
+        self.bar_width = canvas_width / (self.main_array_len + 1)
+        self.array_height = self.canvas_height / len(arrays)
+        self.named_pointers_space_height = min(self.bar_width, self.array_height)
+        self.max_num_height = self.array_height - self.named_pointers_space_height
+
+        self.colors = self.palette.table(self.main_array_len)
+        # Only computed again when the length of the main array or the palette changed.
+
+    def draw_arrays(self, arrays: list, pointers: dict[Pointer, PointerType], relayout: bool):
+        """
+        Draws `arrays`, highlighting `pointers`.
+        `relayout` is True when `self.layout` changed since the last call.
+        """
+        raise NotImplementedError("Renderer is abstract.")
+
+    def draw_named_pointers(self, playground: SortPlayground):
+        named_pointers: dict[str, Pointer] = playground.named_pointers
+
+        for name in self.named_pointer_items.keys() - named_pointers.keys():
+            for item in self.named_pointer_items.pop(name):
+                self.canvas.delete(item)
+
+        for name, pointer in named_pointers.items():
+            array_index, num_index = pointer
+
+            triangle_left_x_pos: float = num_index * self.bar_width
+            triangle_top_y_pos: float = self.canvas_height - array_index * self.array_height - self.named_pointers_space_height
+            triangle_bottom_y_pos: float = triangle_top_y_pos + (self.named_pointers_space_height / 2)
+
+            top_vertex: tuple[float, float] = (triangle_left_x_pos + (self.named_pointers_space_height / 2), triangle_top_y_pos)
+            left_vertex: tuple[float, float] = (triangle_left_x_pos, triangle_bottom_y_pos)
+            right_vertex: tuple[float, float] = (triangle_left_x_pos + self.bar_width, triangle_bottom_y_pos)
+
+            if name in self.named_pointer_items:
+                polygon, text = self.named_pointer_items[name]
+                self.canvas.coords(polygon, *top_vertex, *left_vertex, *right_vertex)
+                self.canvas.coords(text, right_vertex[0], left_vertex[1])
+            else:
+                self.named_pointer_items[name] = (
+                    self.canvas.create_polygon([top_vertex, left_vertex, right_vertex], fill="black", tags="overlay"),
+                    self.canvas.create_text((right_vertex[0], left_vertex[1]), text=name, tags="overlay"),
+                )
+
+    def draw_statistics(self, playground: SortPlayground):
+        for index, (statistic_name, statistic_value) in enumerate(playground.statistics.__dict__.items()):
+            text: str = f"{statistic_name}: {statistic_value}"
+
+            if statistic_name not in self.statistic_items:
+                y_pos: int = index * 20
+                item: int = self.canvas.create_text((0, y_pos), text=text, tags="overlay")
+                self.statistic_items[statistic_name] = (item, text)
+            elif self.statistic_items[statistic_name][1] != text:
+                item = self.statistic_items[statistic_name][0]
+                self.canvas.itemconfig(item, text=text)
+                self.statistic_items[statistic_name] = (item, text)
+
+
+class CanvasRenderer(Renderer):
+    """Canvas Bars"""
+    # Draws each num of each array as its own canvas rectangle (a "bar"), in retained mode:
+    #
+    # Each bar is created once, and only moved/recolored
+    # when its num changes (see `SortPlayground.dirty_reader`)
+    # or when it gets highlighted by the playground's pointers.
+    # The bars are only re-created when the amount of arrays,
+    # their lengths, or the size of the canvas change.
+
+    def __init__(self, canvas: tkinter.Canvas, palette: Palette | None = None):
+        Renderer.__init__(self, canvas, palette)
+
+        self.dirty_reader: DirtyReader | None = None
+
+        self.bars: list[list[int]] = []
+        self.bar_colors: list[list[str]] = []
+        self.highlighted: list[Pointer] = []
+
+    def attach(self, playground: SortPlayground):
+        Renderer.attach(self, playground)
+        self.dirty_reader = playground.dirty_reader()
+
+    def draw_arrays(self, arrays: list, pointers: dict[Pointer, PointerType], relayout: bool):
+        changed: list[numpy.ndarray] | None = self.dirty_reader.read()
+
+        if relayout:
+            self.rebuild(arrays)
+        elif changed is None:
+            for array_index, array in enumerate(arrays):
+                for num_index in range(len(array)):
+                    self.update_bar(arrays, array_index, num_index)
+        else:
+            for array_index, num_indices in enumerate(changed):
+                for num_index in num_indices.tolist():
+                    self.update_bar(arrays, array_index, num_index)
+
+        for pointer in self.highlighted:
+            if pointer not in pointers:
+                self.update_bar(arrays, *pointer)
+        # Give the previously highlighted bars their colors back.
+
+        for pointer, pointer_type in pointers.items():
+            self.update_bar(arrays, *pointer, "white" if pointer_type == READ else "black")
+
+        self.highlighted = list(pointers)
+
+    def rebuild(self, arrays: list):
+        """Re-creates every bar, for the new `self.layout`."""
+        self.canvas.delete("bar")
+
+        self.bars = []
+        self.bar_colors = []
+
+        for array_index, array in enumerate(arrays):
+            array_bars: list[int] = []
+            array_bar_colors: list[str] = []
+
+            for num_index in range(len(array)):
+                color = self.colors.hex_color(array[num_index])
+
+                array_bars.append(self.canvas.create_rectangle(*self.bar_coords(array[num_index], array_index, num_index),
+                                                               fill=color,
+                                                               outline=color,
+                                                               tags="bar"))
+                array_bar_colors.append(color)
+
+            self.bars.append(array_bars)
+            self.bar_colors.append(array_bar_colors)
+
+        self.canvas.tag_raise("overlay")
+        # Keep the named pointers and statistics above the new bars.
+
+    def bar_coords(self, num: int, array_index: int, num_index: int) -> tuple[float, float, float, float]:
+        # Setting the height of the current number such that
+        # its ratio with the height of the array in the canvas
+        # equals the ratio of the number to the max number of the array.
+        #
+        # The array's length cannot be 0, but in case it somehow is,
+        # to prevent dividing by 0, set the height of that array in the canvas to 0,
+        # as if the array weren't even there.
+        try:
+            height = self.max_num_height * num / self.main_array_len
+            # Since the max number in the main array SHOULD BE
+            # no greater than the length of the main array,
+            #
+            # Just assume that the max number in the array IS EQUAL TO the array's len.
+        except ZeroDivisionError:
+            height = 0
+
+        x0 = num_index * self.bar_width
+        x1 = x0 + self.bar_width
+
+        y0 = self.canvas_height - self.array_height * (array_index + 1) + self.max_num_height
+        y1 = y0 - height
+
+        return x0, y0, x1, y1
+
+    def update_bar(self, arrays: list, array_index: int, num_index: int, color: str | None = None):
+        """Moves the bar of the num at (array_index, num_index) to its num's height, and recolors it."""
+        if not (array_index < len(self.bars) and num_index < len(self.bars[array_index])):
+            return
+        # The playground may have changed since the bars were created.
+
+        num = arrays[array_index][num_index]
+
+        if color is None:
+            color = self.colors.hex_color(num)
+
+        bar: int = self.bars[array_index][num_index]
+        self.canvas.coords(bar, *self.bar_coords(num, array_index, num_index))
+
+        if self.bar_colors[array_index][num_index] != color:
+            self.canvas.itemconfig(bar, fill=color, outline=color)
+            self.bar_colors[array_index][num_index] = color
+
+
+class RasterRenderer(Renderer):
+    """Raster"""
+    # Draws all the arrays into one RGB NumPy framebuffer, filling whole
+    # columns of pixels at once, and shows it as a single image in the canvas.
+    #
+    # Each canvas item costs a round trip to Tcl, so drawing one item per num
+    # can't keep up with big arrays. This renderer's cost depends on the
+    # size of the canvas instead. When there are more nums than pixel columns,
+    # each column shows one of its nums.
+
+    READ_COLOR = numpy.array((255, 255, 255), dtype=numpy.uint8)
+    WRITE_COLOR = numpy.array((0, 0, 0), dtype=numpy.uint8)
+
+    def __init__(self, canvas: tkinter.Canvas, palette: Palette | None = None):
+        Renderer.__init__(self, canvas, palette)
+
+        self.background: numpy.ndarray = numpy.zeros(3, dtype=numpy.uint8)
+        self.image: tkinter.PhotoImage | None = None
+        self.image_item: int | None = None
+
+    def draw_arrays(self, arrays: list, pointers: dict[Pointer, PointerType], relayout: bool):
+        canvas_width, canvas_height, _ = self.layout
+
+        if relayout:
+            self.background = numpy.array(self.canvas.winfo_rgb(self.canvas.cget("background")), dtype=numpy.uint16) >> 8
+            # `winfo_rgb` gives 16 bit colors.
+
+            self.canvas.delete("raster")
+            self.image_item = self.canvas.create_image(0, 0, anchor=tkinter.NW, tags="raster")
+            self.canvas.tag_raise("overlay")
+
+        frame = numpy.empty((canvas_height, canvas_width, 3), dtype=numpy.uint8)
+        frame[:] = self.background
+
+        self.fill_arrays(frame, arrays, pointers, relayout)
+
+        self.image = tkinter.PhotoImage(
+            width=canvas_width,
+            height=canvas_height,
+            data=b"P6 %d %d 255 " % (canvas_width, canvas_height) + frame.tobytes(),
+            format="PPM",
+        )
+        self.canvas.itemconfig(self.image_item, image=self.image)
+        # The canvas doesn't keep a reference to the image, so `self.image` does.
+
+    def fill_arrays(self, frame: numpy.ndarray, arrays: list, pointers: dict[Pointer, PointerType], relayout: bool):
+        """Fills `frame` with `arrays`, highlighting `pointers`."""
+        for array_index, array in enumerate(arrays):
+            self.fill_array(frame, array_index, numpy.asarray(array), pointers)
+
+    def fill_array(self, frame: numpy.ndarray, array_index: int, array: numpy.ndarray, pointers: dict[Pointer, PointerType]):
+        """Fills the columns of the array at `array_index` in `frame`, bottom up to each num's height."""
+        canvas_height, canvas_width, _ = frame.shape
+
+        num_indices = numpy.arange(canvas_width) * (self.main_array_len + 1) // canvas_width
+        # The num each column of pixels shows, so that each num is `self.bar_width` wide, like bars.
+        column_count = int(numpy.searchsorted(num_indices, len(array)))
+        if not column_count:
+            return
+        num_indices = num_indices[:column_count]
+
+        nums = array[num_indices]
+        colors = self.colors.rgb_colors(nums)
+
+        for pointer_type, color in ((READ, self.READ_COLOR), (WRITE, self.WRITE_COLOR)):
+            pointer_indices = numpy.array([num_index for (pointer_array_index, num_index), type_ in pointers.items()
+                                           if pointer_array_index == array_index and type_ == pointer_type
+                                           and 0 <= num_index < len(array)], dtype=numpy.int64)
+            if not len(pointer_indices):
+                continue
+
+            starts = numpy.searchsorted(num_indices, pointer_indices, side="left")
+            ends = numpy.searchsorted(num_indices, pointer_indices, side="right")
+            # The columns showing each pointed num, which are next to each other.
+
+            thin = starts == ends
+            starts[thin] = numpy.minimum((pointer_indices[thin] * self.bar_width).astype(numpy.int64), column_count - 1)
+            ends[thin] = starts[thin] + 1
+            # When nums are thinner than a pixel, highlight the column they're in.
+
+            lengths = ends - starts
+            pointer_columns = numpy.repeat(starts - numpy.cumsum(lengths) + lengths, lengths) + numpy.arange(lengths.sum())
+
+            nums[pointer_columns] = array[numpy.repeat(pointer_indices, lengths)]
+            colors[pointer_columns] = color
+        # Writes are applied last, so they win over reads in the same column.
+
+        bottom, rows = self.array_rows(frame, array_index)
+        if not len(rows):
+            return
+
+        filled = rows[:, None] >= (bottom - self.num_heights(nums))[None, :]
+        # Each column is filled from its num's height down to the bottom of the array.
+
+        numpy.copyto(frame[rows[0]:rows[-1] + 1, :column_count], colors[None, :, :], where=filled[:, :, None])
+
+    def array_rows(self, frame: numpy.ndarray, array_index: int) -> tuple[float, numpy.ndarray]:
+        """Returns the bottom of the array at `array_index`, and the rows of `frame` its nums can fill."""
+        bottom = self.canvas_height - self.array_height * (array_index + 1) + self.max_num_height
+        top_row = max(0, int(bottom - self.max_num_height))
+        bottom_row = min(len(frame), int(numpy.ceil(bottom)))
+
+        return bottom, numpy.arange(top_row, max(top_row, bottom_row))
+
+    def num_heights(self, nums: numpy.ndarray) -> numpy.ndarray:
+        """Same as the heights in `CanvasRenderer.bar_coords`, for many nums at once."""
+        if not self.main_array_len:
+            return numpy.zeros(len(nums))
+
+        return self.max_num_height * nums / self.main_array_len
+
+
+class PixelColumnRenderer(RasterRenderer):
+    """Pixel Columns"""
+    # Draws arrays with more nums than the canvas has pixel columns,
+    # by grouping the nums of each array into one bucket per column.
+    #
+    # Each column is filled up to the smallest num of its bucket,
+    # with a dimmer color up to its biggest num, and a line at its mean.
+    # A column is highlighted if any of its nums is pointed at
+    # (writes win over reads).
+    #
+    # The min/max/sum of each bucket are kept between frames,
+    # and only the buckets with nums that were written since the last frame
+    # (see `SortPlayground.dirty_reader`) are computed again,
+    # so a frame costs O(canvas width + changed buckets' nums), not O(nums).
+    # With fewer nums than columns, each bucket is a single num as wide as a bar.
+
+    def __init__(self, canvas: tkinter.Canvas, palette: Palette | None = None):
+        RasterRenderer.__init__(self, canvas, palette)
+
+        self.dirty_reader: DirtyReader | None = None
+
+        self.bucket_starts: list[numpy.ndarray] = []
+        """For each array, the index of the first num of each bucket, then the array's length."""
+        self.column_buckets: list[numpy.ndarray] = []
+        """For each array, the bucket shown by each pixel column."""
+        self.mins: list[numpy.ndarray] = []
+        self.maxes: list[numpy.ndarray] = []
+        self.sums: list[numpy.ndarray] = []
+
+    def attach(self, playground: SortPlayground):
+        RasterRenderer.attach(self, playground)
+        self.dirty_reader = playground.dirty_reader()
+
+    def fill_arrays(self, frame: numpy.ndarray, arrays: list, pointers: dict[Pointer, PointerType], relayout: bool):
+        changed: list[numpy.ndarray] | None = self.dirty_reader.read()
+
+        if relayout:
+            self.bucket_starts = []
+            self.column_buckets = []
+
+            for array in arrays:
+                column_count = min(len(frame[0]), round(len(array) * self.bar_width))
+                bucket_count = min(len(array), column_count)
+
+                self.bucket_starts.append(numpy.arange(bucket_count + 1) * len(array) // max(1, bucket_count))
+                self.column_buckets.append(numpy.arange(column_count) * bucket_count // max(1, column_count))
+
+        if changed is None or relayout:
+            self.mins = []
+            self.maxes = []
+            self.sums = []
+
+            for array_index, array in enumerate(arrays):
+                nums = numpy.asarray(array, dtype=numpy.int64)
+                bucket_starts = self.bucket_starts[array_index][:-1]
+
+                if len(bucket_starts):
+                    self.mins.append(numpy.minimum.reduceat(nums, bucket_starts))
+                    self.maxes.append(numpy.maximum.reduceat(nums, bucket_starts))
+                    self.sums.append(numpy.add.reduceat(nums, bucket_starts))
+                else:
+                    self.mins.append(nums[:0])
+                    self.maxes.append(nums[:0])
+                    self.sums.append(nums[:0])
+        else:
+            for array_index, num_indices in enumerate(changed):
+                if len(num_indices):
+                    self.update_buckets(arrays[array_index], array_index, num_indices)
+
+        for array_index in range(len(arrays)):
+            self.fill_columns(frame, array_index, pointers)
+
+    def update_buckets(self, array, array_index: int, num_indices: numpy.ndarray):
+        """Computes the min/max/sum again for the buckets of the array at `array_index` that contain `num_indices`."""
+        bucket_starts = self.bucket_starts[array_index]
+
+        changed_ranges = numpy.array(ranges(num_indices))
+        first_buckets = numpy.searchsorted(bucket_starts, changed_ranges[:, 0], side="right") - 1
+        last_buckets = numpy.searchsorted(bucket_starts, changed_ranges[:, 1] - 1, side="right") - 1
+
+        marks = numpy.zeros(len(bucket_starts), dtype=numpy.int64)
+        numpy.add.at(marks, first_buckets, 1)
+        numpy.add.at(marks, last_buckets + 1, -1)
+        buckets = numpy.flatnonzero(numpy.cumsum(marks)[:-1])
+        # Every bucket between the first and last bucket of each range.
+
+        starts = bucket_starts[buckets]
+        lengths = bucket_starts[buckets + 1] - starts
+        offsets = numpy.cumsum(lengths) - lengths
+        positions = numpy.repeat(starts - offsets, lengths) + numpy.arange(lengths.sum())
+        # The indices of every num in those buckets, bucket after bucket.
+
+        if isinstance(array, numpy.ndarray):
+            nums = array[positions].astype(numpy.int64)
+        else:
+            nums = numpy.fromiter(map(array.__getitem__, positions.tolist()), dtype=numpy.int64, count=len(positions))
+
+        self.mins[array_index][buckets] = numpy.minimum.reduceat(nums, offsets)
+        self.maxes[array_index][buckets] = numpy.maximum.reduceat(nums, offsets)
+        self.sums[array_index][buckets] = numpy.add.reduceat(nums, offsets)
+
+    def fill_columns(self, frame: numpy.ndarray, array_index: int, pointers: dict[Pointer, PointerType]):
+        """Fills the columns of the array at `array_index` in `frame` with the envelopes of their buckets."""
+        column_buckets = self.column_buckets[array_index]
+        if not len(column_buckets):
+            return
+
+        bucket_starts = self.bucket_starts[array_index]
+        means = self.sums[array_index] / numpy.diff(bucket_starts)
+
+        colors = self.colors.rgb_colors(numpy.rint(means).astype(numpy.int64))
+        dim_colors = ((colors.astype(numpy.uint16) + self.background) // 2).astype(numpy.uint8)
+
+        for pointer_type, color in ((READ, self.READ_COLOR), (WRITE, self.WRITE_COLOR)):
+            pointer_indices = [num_index for (pointer_array_index, num_index), type_ in pointers.items()
+                               if pointer_array_index == array_index and type_ == pointer_type]
+            pointer_buckets = numpy.searchsorted(bucket_starts, pointer_indices, side="right") - 1
+            pointer_buckets = pointer_buckets[(0 <= pointer_buckets) & (pointer_buckets < len(colors))]
+
+            colors[pointer_buckets] = color
+            dim_colors[pointer_buckets] = color
+        # Writes are applied last, so they win over reads in the same bucket.
+
+        bottom, rows = self.array_rows(frame, array_index)
+        if not len(rows):
+            return
+
+        min_tops = (bottom - self.num_heights(self.mins[array_index]))[column_buckets]
+        max_tops = (bottom - self.num_heights(self.maxes[array_index]))[column_buckets]
+        mean_rows = numpy.floor(bottom - self.num_heights(means))[column_buckets]
+
+        rows = rows[:, None]
+        filled = rows >= max_tops[None, :]
+        solid = filled & ((rows >= min_tops[None, :]) | (rows == mean_rows[None, :]))
+
+        band = frame[rows[0, 0]:rows[-1, 0] + 1, :len(column_buckets)]
+        numpy.copyto(band, dim_colors[column_buckets][None, :, :], where=filled[:, :, None])
+        numpy.copyto(band, colors[column_buckets][None, :, :], where=solid[:, :, None])
+
+
+renderers = [PixelColumnRenderer, CanvasRenderer, RasterRenderer]
+
+
+class FrameScheduler:
+    """
+    Calls `frame` from Tk's event loop (with `after`) up to `fps` times per second,
+    instead of sleeping between frames.
+
+    `frame` returns whether it drew anything, so frames that were skipped
+    (because nothing changed) don't count in the frame times.
+    When a frame takes longer than its time slot, the frames it overlapped
+    are dropped, and the next frame is scheduled for the next free slot,
+    so the display never falls behind.
+    """
+
+    histogram_bounds: tuple[float, ...] = (1, 2, 4, 8, 16, 33, 66, 133)
+    """Upper bounds (in milliseconds) of each bucket of `self.histogram`. The last bucket has no bound."""
+
+    def __init__(self, root: tkinter.Misc, frame: Callable[[], bool], fps: int = 60):
+        self.root = root
+        self.frame = frame
+        self.fps = fps
+
+        self.deadline: float = 0
+        # When the current frame's time slot ends.
+
+        self.histogram: list[int] = [0] * (len(self.histogram_bounds) + 1)
+        """How many drawn frames took each range of milliseconds (see `self.histogram_bounds`)."""
+        self.drawn_frames = 0
+        self.skipped_frames = 0
+        self.dropped_frames = 0
+
+    def start(self):
+        self.deadline = perf_counter()
+        self.root.after_idle(self.tick)
+
+    def tick(self):
+        period = 1 / self.fps
+
+        start = perf_counter()
+        if self.frame():
+            frame_time = perf_counter() - start
+
+            self.histogram[bisect_left(self.histogram_bounds, frame_time * 1000)] += 1
+            self.drawn_frames += 1
+        else:
+            self.skipped_frames += 1
+
+        self.deadline += period
+        now = perf_counter()
+
+        if now > self.deadline:
+            missed = int((now - self.deadline) / period) + 1
+            self.dropped_frames += missed
+            self.deadline += missed * period
+        # Skip the slots that already passed, instead of drawing them late.
+
+        self.root.after(max(1, round((self.deadline - now) * 1000)), self.tick)
+
+    def __str__(self) -> str:
+        lines = [f"{self.drawn_frames} frames drawn, {self.skipped_frames} skipped (unchanged), {self.dropped_frames} dropped"]
+
+        lower_bound: float = 0
+        for upper_bound, count in zip((*self.histogram_bounds, float("inf")), self.histogram):
+            lines.append(f"{lower_bound:>4g} - {upper_bound:<4g}ms: {count}")
+            lower_bound = upper_bound
+
+        return "\n".join(lines)
+
+
 class SortApp(tkinter.Tk):
-    def __init__(self, sort_control: SortControl):
+    def __init__(self, sort_control: SortControl, fps: int = 60, max_voices: int = 256, record: bool = False):
         tkinter.Tk.__init__(self)
 
         self.sort_control = sort_control
 
-        self.audio_control = AudioControl(self.sort_control, 4)
+        self.audio_control = AudioControl(self.sort_control, 4, max_voices)
 
         self.canvas = tkinter.Canvas(self, width=1024, height=512)
         self.canvas.pack()
+        self.renderer_classes = {renderer_cls.__doc__: renderer_cls for renderer_cls in renderers}
+        self.palette_instances = {palette_cls.__doc__: palette_cls() for palette_cls in palettes}
+        # One of each, shared by every renderer, so their color tables are only computed once.
+        self.renderer: Renderer = PixelColumnRenderer(self.canvas, self.palette_instances[RainbowPalette.__doc__])
+        # It looks like `CanvasRenderer` for small arrays, and keeps up with big ones.
 
-        self.play = tkinter.Button(self, text=self.play_text, command=self.sort_control.pause_play)
+        self.play = tkinter.Button(self, text=self.play_text, command=self.pause_play)
         self.play.pack()
 
+        self.replay: Replay | None = None
+        """The recorded run being scrubbed through, or None while showing the live run."""
+        self.live_step: int = 0
+
+        self.replay_frame = tkinter.Frame(self)
+        self.step_backward_button = tkinter.Button(self.replay_frame, text="<", command=self.step_backward)
+        self.step_backward_button.pack(side=tkinter.LEFT)
+        self.scrub = tkinter.Scale(self.replay_frame,
+                                   from_=0,
+                                   to=0,
+                                   orient=tkinter.HORIZONTAL,
+                                   length=960,
+                                   showvalue=False,
+                                   command=self.scrub_to)
+        self.scrub.pack(side=tkinter.LEFT)
+        self.step_forward_button = tkinter.Button(self.replay_frame, text=">", command=self.step_forward)
+        self.step_forward_button.pack(side=tkinter.LEFT)
+        self.record_variable = tkinter.BooleanVar(self, record)
+        tkinter.Checkbutton(self.replay_frame, text="record", variable=self.record_variable,
+                            command=self.change_recording).pack(side=tkinter.LEFT)
+        self.replay_frame.pack()
+
         self.settings_button = tkinter.Button(self, text="Sorts/Shuffles", command=self.goto_settings)
         self.settings_button.pack()
 
@@ -442,15 +1608,15 @@ class SortApp(tkinter.Tk):
 
 
         def sort_callback(new_sort: str, new_options: dict[str, Option]) -> None:
-            self.sort_control.choose_sort(new_sort, new_options)
+            self.sort_control.send(SortControl.choose_sort, new_sort, new_options)
 
 
         def input_callback(new_input: str, new_options: dict[str, Option]) -> None:
-            self.sort_control.choose_input(new_input, new_options)
+            self.sort_control.send(SortControl.choose_input, new_input, new_options)
 
 
         def shuffle_callback(new_shuffle: str, new_options: dict[str, Option]) -> None:
-            self.sort_control.choose_shuffle(new_shuffle, new_options)
+            self.sort_control.send(SortControl.choose_shuffle, new_shuffle, new_options)
 
 
         self.sort_menu_frame = tkinter.Frame(self)
@@ -482,120 +1648,190 @@ class SortApp(tkinter.Tk):
         self.shuffle_menu.pack()
 
         self.size_variable = tkinter.IntVar(self, self.sort_control.main_array_len)
+        self.max_size = 10 ** 6
+        self.size_steps_per_decade = 100
+        # The size Scale is logarithmic, so small sizes can still be chosen precisely.
+        self.storage_variable = tkinter.StringVar(self, self.sort_control.storage.__doc__)
+        self.renderer_variable = tkinter.StringVar(self, self.renderer.__doc__)
+        self.palette_variable = tkinter.StringVar(self, self.renderer.palette.__doc__)
+        self.waveform_instances = {waveform_cls.__doc__: waveform_cls() for waveform_cls in waveforms}
+        self.waveform_variable = tkinter.StringVar(self, self.audio_control.voices.waveform.__doc__)
         self.choosing_sort = False
 
-        self.min_delay = 0
-        self.max_delay = 1
+        self.min_speed = 1
+        self.max_speed = 10 ** 7
         self.display_factor = 12
-        self.log_factor = 2 ** (1 / self.display_factor)
-        # in seconds
-        self.speed_control = tkinter.Scale(self,
-                                           from_=self.max_delay * self.display_factor,
-                                           to=self.min_delay,
-                                           orient=tkinter.HORIZONTAL)
-        # 1s delay to 0s delay mapped as 1023 -> 0
-        self.speed_control.pack()
+        # in steps per second
+        self.speed_frame = tkinter.Frame(self)
+        self.speed_control = tkinter.Scale(self.speed_frame,
+                                           from_=numpy.log10(self.min_speed) * self.display_factor,
+                                           to=numpy.log10(self.max_speed) * self.display_factor,
+                                           orient=tkinter.HORIZONTAL,
+                                           length=512,
+                                           showvalue=False,
+                                           command=lambda value: self.control_speed())
+        # 1 to 10^7 steps/s mapped as 0 -> 84
+        self.speed_control.set(round(numpy.log10(self.sort_control.speed) * self.display_factor))
+        self.speed_control.pack(side=tkinter.LEFT)
+        self.speed_text = tkinter.StringVar(self)
+        tkinter.Label(self.speed_frame, textvariable=self.speed_text, width=16).pack(side=tkinter.LEFT)
+        self.speed_frame.pack()
+        self.control_speed()
+
+        self.fps_variable = tkinter.IntVar(self, fps)
+        self.frame_scheduler = FrameScheduler(self, self.frame, fps)
+        self.shown_state: tuple = ()
+        # What the latest frame showed, to know when there's nothing new to draw.
+        self.frame_scheduler.start()
 
     @property
     def play_text(self):
         return "pause" if self.sort_control.playing else "play"
 
+    def pause_play(self):
+        self.replay = None
+        # Playing goes back to the live run.
+        self.sort_control.send(SortControl.pause_play)
+
+    def change_recording(self):
+        """Callback of the record Checkbutton."""
+        if not self.record_variable.get():
+            self.replay = None
+        # The recording being shown is deleted.
+
+        self.sort_control.send(SortControl.change_recording, self.record_variable.get())
+
+    def enter_replay(self) -> bool:
+        """
+        Pauses the live run, and starts showing its recording instead, at its latest step.
+        Returns False if the run isn't being recorded, and records it from now on.
+        """
+        replay: Replay | None = self.sort_control.request_replay()
+        if replay is None:
+            self.record_variable.set(True)
+            self.change_recording()
+            return False
+
+        replay.seek(len(replay))
+        self.scrub.config(from_=replay.first_step, to=len(replay))
+        self.replay = replay
+        return True
+
+    def scrub_to(self, value: str):
+        """Callback of `self.scrub`."""
+        step = int(float(value))
+
+        if self.replay is None:
+            if step == self.live_step:
+                return
+            # `self.display` moves the scrub along with the live run.
+
+            if not self.enter_replay():
+                return
+
+        self.replay.seek(step)
+
+    def step_backward(self):
+        if self.replay is None and not self.enter_replay():
+            return
+
+        self.replay.seek(max(self.replay.first_step, self.replay.step - 1))
+        self.scrub.set(self.replay.step)
+
+    def step_forward(self):
+        if self.replay is None and not self.enter_replay():
+            return
+
+        self.replay.seek(self.replay.step + 1)
+        self.scrub.set(self.replay.step)
+
     def control_speed(self):
-        visual_delay = int(self.speed_control.get())
-        base = 2
-        delay = (base ** visual_delay - 1) / (base ** self.display_factor - 1)
+        visual_speed = int(self.speed_control.get())
+        speed = 10 ** (visual_speed / self.display_factor)
         # It's easier to slide the speed Scale when speeds are exponential.
 
-        self.sort_control.change_delay(delay)
+        self.speed_text.set(f"{speed:,.0f} steps/s")
+        self.sort_control.send(SortControl.change_speed, speed)
+
+    @property
+    def shown_playground(self) -> SortPlayground:
+        return self.replay if self.replay is not None else self.sort_control.snapshot
+
+    def display_state(self) -> tuple:
+        """Everything `self.display` shows. Nothing needs to be drawn while it stays the same."""
+        playground: SortPlayground = self.shown_playground
+
+        return (
+            playground,
+            self.replay.step if self.replay is not None else None,
+            self.sort_control.playing,
+            self.canvas.winfo_width(),
+            self.canvas.winfo_height(),
+            self.renderer,
+            self.renderer.palette,
+            tuple(len(array) for array in playground.arrays),
+            tuple(vars(playground.statistics).values()),
+            tuple(playground.pointers.items()),
+            tuple(playground.named_pointers.items()),
+        )
+        # Every operation changes the statistics or the pointers,
+        # so this doesn't need to look at the arrays themselves.
+
+    def frame(self) -> bool:
+        """Callback of `self.frame_scheduler`. Returns False if nothing changed since the last frame."""
+        with self.sort_control.snapshot.lock:
+            # The snapshot can't be swapped while it's being drawn.
+            state = self.display_state()
+
+            if state == self.shown_state:
+                return False
+
+            self.shown_state = state
+            self.display()
+            return True
 
     def display(self):
         self.play.config(text=self.play_text)
 
-        self.canvas.delete("all")
+        playground: SortPlayground = self.shown_playground
 
-        # I want to display each array taking equal space vertically, with
-        # the main array at the bottom, and each new extra array higher and higher.
-        # But, I want to display the pointers in `self.sort_control.named_pointers`
-        # in a space below each array, which would take some percent of the array's
-        # space at the bottom.
-        #
-        # Since there are `self.sort_control.array_count` arrays, and the canvas
-        # has height `self.canvas.winfo_height()`, each array's "height" should be
-        # self.canvas.winfo_height() / self.sort_control.array_count.
-        #
-        # I also want the max number in the main array to be the full height of the space
-        # the arrays are given to display their numbers, and every other number
-        # will have height proportional to the max number. The max number is they arrays'
-        # "height" minus the percent reserved for the named pointers.
-        bar_width: float = self.canvas.winfo_width() / (self.sort_control.main_array_len + 1)
-        array_height: float = self.canvas.winfo_height() / self.sort_control.array_count
-        named_pointers_space_height: float = min(bar_width, array_height)
-        max_num_height: float = array_height - named_pointers_space_height
-
-        for array_index, array in enumerate(self.sort_control.arrays):
-
-            for num_index, num in enumerate(array):
-                # Setting the height of the current number such that
-                # its ratio with the height of the array in the canvas
-                # equals the ratio of the number to the max number of the array.
-                #
-                # The array's length cannot be 0, but in case it somehow is,
-                # to prevent dividing by 0, set the height of that array in the canvas to 0,
-                # as if the array weren't even there.
-                try:
-                    height = max_num_height * num / self.sort_control.main_array_len
-                    # Since the max number in the main array SHOULD BE
-                    # no greater than the length of the main array,
-                    #
-                    # Just assume that the max number in the array IS EQUAL TO the array's len.
-                except ZeroDivisionError:
-                    height = 0
-
-                x0 = num_index * bar_width
-                x1 = x0 + bar_width
-
-                y0 = self.canvas.winfo_height() - array_height * (array_index + 1) + max_num_height
-                y1 = y0 - height
-
-                color: str = ""
-
-                if (array_index, num_index) in self.sort_control.pointers:
-                    if self.sort_control.pointers[(array_index, num_index)] == READ:
-                        color = "white"
-                    else:
-                        color = "black"
-                else:
-                    color = rainbow_color(num, self.sort_control.main_array_len)
-
-                self.canvas.create_rectangle(x0,
-                                             y0,
-                                             x1,
-                                             y1,
-                                             fill=color,
-                                             outline=color)
-
-        # Since the pointers are in `self.sort_control`, which is another Thread,
-        # we need to copy the `named_pointers` dict before iterating over it,
-        # in case it changes while we're iterating over it.
-        for name, pointer in self.sort_control.named_pointers.copy().items():
-            array_index, num_index = pointer
+        recorded_steps: int | None = self.sort_control.recorded_steps
+        if self.replay is None:
+            self.live_step = recorded_steps if recorded_steps is not None else 0
+            self.scrub.config(from_=0, to=self.live_step)
+            self.scrub.set(self.live_step)
 
-            triangle_left_x_pos: float = num_index * bar_width
-            triangle_top_y_pos: float = self.canvas.winfo_height() - array_index * array_height - named_pointers_space_height
-            triangle_bottom_y_pos: float = triangle_top_y_pos + (named_pointers_space_height / 2)
+        self.renderer.draw(playground)
 
-            top_vertex: tuple[float, float] = (triangle_left_x_pos + (named_pointers_space_height / 2), triangle_top_y_pos)
-            left_vertex: tuple[float, float] = (triangle_left_x_pos, triangle_bottom_y_pos)
-            right_vertex: tuple[float, float] = (triangle_left_x_pos + bar_width, triangle_bottom_y_pos)
+    def choose_size(self, value: str):
+        """Callback of the size Scale in the settings."""
+        step = round(float(value))
+
+        if step == round(numpy.log10(self.size_variable.get()) * self.size_steps_per_decade):
+            return
+        # Setting the Scale to the current size calls this too, and shouldn't round the size.
+
+        self.size_variable.set(round(10 ** (step / self.size_steps_per_decade)))
+
+    def choose_renderer(self, renderer_name: str):
+        renderer_cls = self.renderer_classes[renderer_name]
+
+        if type(self.renderer) is not renderer_cls:
+            self.canvas.delete("all")
+            self.renderer = renderer_cls(self.canvas, self.renderer.palette)
+
+    def choose_palette(self, palette_name: str):
+        palette = self.palette_instances[palette_name]
 
-            self.canvas.create_polygon([top_vertex, left_vertex, right_vertex], fill="black")
-            self.canvas.create_text((right_vertex[0], left_vertex[1]), text=name)
+        if palette is not self.renderer.palette:
+            self.renderer.change_palette(palette)
 
-        for index, (statistic_name, statistic_value) in enumerate(self.sort_control.statistics.__dict__.items()):
-            y_pos: int = index * 20
-            self.canvas.create_text((0, y_pos), text=f"{statistic_name}: {statistic_value}")
+    def choose_waveform(self, waveform_name: str):
+        waveform = self.waveform_instances[waveform_name]
 
-        self.canvas.update()
+        if type(waveform) is not type(self.audio_control.voices.waveform):
+            self.audio_control.voices.waveform = waveform
+        # Notes that are playing switch to the new table right away.
 
     def clear_screen(self):
         for child in self.winfo_children():
@@ -605,15 +1841,22 @@ class SortApp(tkinter.Tk):
         self.clear_screen()
         self.choosing_sort = False
 
-        self.sort_control.change_main_array_len(self.size_variable.get())
+        self.sort_control.send(SortControl.choose_storage, self.storage_variable.get())
+        self.sort_control.send(SortControl.change_main_array_len, self.size_variable.get())
+        self.choose_renderer(self.renderer_variable.get())
+        self.choose_palette(self.palette_variable.get())
+        self.choose_waveform(self.waveform_variable.get())
+        self.frame_scheduler.fps = self.fps_variable.get()
 
         self.canvas.pack()
         self.play.pack()
-        self.speed_control.pack()
+        self.replay_frame.pack()
+        self.speed_frame.pack()
         self.settings_button.pack()
 
     def goto_settings(self):
         self.clear_screen()
+        self.replay = None
 
         self.choosing_sort = True
 
@@ -621,31 +1864,57 @@ class SortApp(tkinter.Tk):
         self.input_menu_frame.pack(fill=tkinter.X)
         self.shuffle_menu_frame.pack(fill=tkinter.X)
 
-        tkinter.Scale(self, from_=1, to=1024, variable=self.size_variable, length=1088, orient=tkinter.HORIZONTAL).pack()
+        tkinter.Label(self, textvariable=self.size_variable).pack()
+        size_scale = tkinter.Scale(self,
+                                   from_=0,
+                                   to=round(numpy.log10(self.max_size) * self.size_steps_per_decade),
+                                   length=1088,
+                                   showvalue=False,
+                                   orient=tkinter.HORIZONTAL,
+                                   command=self.choose_size)
+        size_scale.set(round(numpy.log10(self.size_variable.get()) * self.size_steps_per_decade))
+        size_scale.pack()
 
-        tkinter.Button(self, text="OK", command=self.exit_settings).pack()
+        tkinter.Label(self, text="storage").pack()
+        tkinter.OptionMenu(self, self.storage_variable, *self.sort_control.storage_classes.keys()).pack()
 
-    def mainloop(self, n: int = ...) -> None:
-        while True:
-            try:
-                self.winfo_exists()
-            except tkinter.TclError:
-                return
-            else:
-                sleep(0.05)
-                self.control_speed()
-                self.display()
-                self.update()
-        # Please let me know if this code can be improved...
+        tkinter.Label(self, text="display").pack()
+        tkinter.OptionMenu(self, self.renderer_variable, *self.renderer_classes.keys()).pack()
+
+        tkinter.Label(self, text="colors").pack()
+        tkinter.OptionMenu(self, self.palette_variable, *self.palette_instances.keys()).pack()
+
+        tkinter.Label(self, text="sound").pack()
+        tkinter.OptionMenu(self, self.waveform_variable, *self.waveform_instances.keys()).pack()
+
+        tkinter.Label(self, text="frames per second").pack()
+        tkinter.Scale(self, from_=1, to=240, variable=self.fps_variable, length=256, orient=tkinter.HORIZONTAL).pack()
+
+        tkinter.Button(self, text="OK", command=self.exit_settings).pack()
 
 
 def main():
-    core = SortControl(256, 0.002)
-    front_end = SortApp(core)
+    parser = argparse.ArgumentParser(description="Sorting algorithm visualizer.")
+    parser.add_argument("--process", action="store_true",
+                        help="Runs the algorithms in a separate process, with their arrays in shared memory.")
+    parser.add_argument("--voices", type=int, default=256,
+                        help="The most notes that can play at once (fewer if the audio can't keep up).")
+    parser.add_argument("--record", action="store_true",
+                        help="Records every run from the start, so it can be scrubbed through. "
+                             "Otherwise, recording starts with the record checkbox, or the first step back or forward.")
+    args = parser.parse_args()
+
+    core = (ProcessSortControl(256, 500, args.record) if args.process
+            else SortControl(256, 500, record=args.record))
     core.start()
+    # Before creating any window, since it can start a process.
+    front_end = SortApp(core, max_voices=args.voices, record=args.record)
     front_end.mainloop()
+    front_end.audio_control.close()
     core.exit()
     core.join()
+    print(front_end.frame_scheduler)
+    print(front_end.audio_control)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,77 @@
+from algorithms.playground import SortPlayground
+from algorithms.storage import ListStorage, NumpyStorage, NumpyInt32Storage
+from algorithms.comparison import Comparator, OPERATORS
+import numpy
+import random
+import unittest
+
+
+def shuffled_playground(main_array_len: int, storage, comparator: Comparator | None = None) -> SortPlayground:
+    nums = list(range(1, main_array_len + 1))
+    random.Random(main_array_len).shuffle(nums)
+
+    playground = SortPlayground(main_array_len, storage, comparator)
+    playground.arrays[0] = storage.convert(nums)
+    return playground
+
+
+class TestCompareExchange(unittest.TestCase):
+    def test_matches_compare_and_swap(self):
+        comparators = {
+            "plain": lambda: None,
+            "key": lambda: Comparator(key=lambda num: -num),
+            "cmp": lambda: Comparator(cmp=lambda a, b: (a % 7) - (b % 7)),
+        }
+
+        for storage_cls in (ListStorage, NumpyStorage, NumpyInt32Storage):
+            for name, comparator in comparators.items():
+                with self.subTest(storage=storage_cls.__doc__, comparator=name):
+                    batched = shuffled_playground(64, storage_cls(), comparator())
+                    one_by_one = shuffled_playground(64, storage_cls(), comparator())
+
+                    rng = random.Random(1)
+                    for _ in range(10):
+                        positions = rng.sample(range(64), 40)
+                        lows, highs = numpy.array(positions[:20]), numpy.array(positions[20:])
+
+                        swaps = batched.compare_exchange(lows, highs)
+
+                        expected_swaps = 0
+                        for low, high in zip(lows.tolist(), highs.tolist()):
+                            if one_by_one.compare((0, low), ">", (0, high)):
+                                one_by_one.swap((0, low), (0, high))
+                                expected_swaps += 1
+
+                        self.assertEqual(swaps, expected_swaps)
+                        self.assertEqual(list(batched.arrays[0]), list(one_by_one.arrays[0]))
+                        self.assertEqual(batched.statistics, one_by_one.statistics)
+
+
+class TestComparator(unittest.TestCase):
+    def test_operators(self):
+        comparator = Comparator()
+
+        for comparison, operator in OPERATORS.items():
+            with self.subTest(comparison=comparison):
+                self.assertEqual(comparator.resolve(comparison)(1, 2), operator(1, 2))
+                self.assertEqual(comparator.compare_arrays(comparison, numpy.array([1, 2, 3]), numpy.array([2, 2, 2])).tolist(),
+                                 [operator(a, 2) for a in (1, 2, 3)])
+
+    def test_unknown_operators_raise(self):
+        for comparator in (Comparator(), Comparator(key=abs)):
+            for comparison in ("=>", "<>", "", "gt"):
+                with self.subTest(comparator=comparator, comparison=comparison):
+                    with self.assertRaises(ValueError):
+                        comparator.resolve(comparison)
+                    with self.assertRaises(ValueError):
+                        comparator.compare_arrays(comparison, numpy.array([1]), numpy.array([2]))
+
+    def test_unknown_operators_raise_in_playgrounds(self):
+        playground = SortPlayground(4)
+
+        with self.assertRaises(ValueError):
+            playground.compare((0, 0), "=>", (0, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
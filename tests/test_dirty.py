@@ -0,0 +1,49 @@
+from algorithms.playground import SortPlayground
+from algorithms.dirty import BLOCK_SIZE
+import numpy
+import random
+import unittest
+
+
+class TestDirtyReader(unittest.TestCase):
+    def test_reads_exactly_the_written_positions(self):
+        playground = SortPlayground(10 * BLOCK_SIZE + 3)
+        # The last block is shorter than the others.
+        reader = playground.dirty_reader()
+        self.assertIsNone(reader.read())
+
+        rng = random.Random(0)
+        for _ in range(50):
+            written = set()
+
+            for _ in range(rng.randrange(20)):
+                index = rng.randrange(playground.main_array_len)
+                playground.write(0, (0, index))
+                written.add(index)
+
+            if rng.random() < 0.5:
+                start = rng.randrange(playground.main_array_len)
+                end = rng.randrange(start, playground.main_array_len + 1)
+                playground.write_slice([0] * (end - start), (0, start))
+                written.update(range(start, end))
+
+            with self.subTest(written=sorted(written)):
+                changed = reader.read()
+                self.assertEqual(len(changed), 1)
+                self.assertEqual(changed[0].tolist(), sorted(written))
+
+    def test_compare_exchange_marks_swapped_positions(self):
+        playground = SortPlayground(4 * BLOCK_SIZE)
+        playground.arrays[0] = list(range(playground.main_array_len, 0, -1))
+        reader = playground.dirty_reader()
+        reader.read()
+
+        lows = numpy.arange(0, BLOCK_SIZE, 2)
+        highs = lows + 3 * BLOCK_SIZE
+        playground.compare_exchange(lows, highs)
+
+        self.assertEqual(reader.read()[0].tolist(), sorted([*lows.tolist(), *highs.tolist()]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+from algorithms.playground import SortPlayground
+from algorithms.inputs import Linear
+from algorithms.algorithms import Shuffle
+from algorithms.sorts import RadixMSDSort
+from concurrent.futures import Executor, Future
+from itertools import chain
+import unittest
+
+
+class InlineExecutor(Executor):
+    """Runs what's submitted right away, in this process, and counts it."""
+
+    def __init__(self):
+        self.submitted = 0
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        self.submitted += 1
+
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+def run_radix_msd(main_array_len: int, pool: Executor | None, workers: int = 1) -> SortPlayground:
+    playground = SortPlayground(main_array_len)
+    sort = RadixMSDSort(playground)
+    sort.pool = pool
+    sort.workers = workers
+
+    for _ in chain(Linear(playground).run(), Shuffle(playground).run(), sort.run()):
+        pass
+
+    return playground
+
+
+class TestRadixMSDInPool(unittest.TestCase):
+    def test_splits_into_buckets_for_every_worker(self):
+        pool = InlineExecutor()
+        playground = run_radix_msd(10000, pool, workers=2)
+        # 1..10000 in base 10 only has 2 top-level buckets, and one of them is a single num.
+
+        self.assertGreaterEqual(pool.submitted, 4 * 2)
+        self.assertEqual(list(playground.main_array), list(range(1, 10001)))
+
+    def test_sorts_like_without_a_pool(self):
+        for main_array_len in (0, 1, 15, 16, 17, 1000):
+            with self.subTest(main_array_len=main_array_len):
+                playground = run_radix_msd(main_array_len, InlineExecutor(), workers=4)
+                self.assertEqual(list(playground.main_array), list(range(1, main_array_len + 1)))
+                self.assertEqual(len(playground.arrays), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+from algorithms.playground import SortPlayground, Statistics
+from algorithms.inputs import Linear
+from algorithms.algorithms import Shuffle
+from algorithms.sorts import RadixLSDSort
+from algorithms.trace import TraceRecorder, read_trace
+from algorithms.replay import Replay, apply_records
+from itertools import chain
+from tempfile import TemporaryDirectory
+import os
+import random
+import unittest
+
+
+class TestReplaySeek(unittest.TestCase):
+    def setUp(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "run.trace")
+
+        playground = SortPlayground(200)
+        with TraceRecorder(path) as recorder:
+            playground.start_recording(recorder)
+            for _ in chain(Linear(playground).run(), Shuffle(playground).run(), RadixLSDSort(playground).run()):
+                pass
+            playground.stop_recording()
+
+        self.records = read_trace(path)
+
+    def test_seek_matches_replaying_from_the_start(self):
+        replay = Replay(self.records, keyframe_interval=64)
+
+        steps = list(range(0, len(self.records) + 1, 97)) + [len(self.records)]
+        random.Random(0).shuffle(steps)
+        # In any order, so seeking goes back as well as forward.
+
+        for step in steps:
+            with self.subTest(step=step):
+                replay.seek(step)
+
+                arrays, statistics = [], Statistics()
+                apply_records(arrays, statistics, self.records[:step])
+
+                self.assertEqual(len(replay.arrays), len(arrays))
+                for replayed, expected in zip(replay.arrays, arrays):
+                    self.assertEqual(replayed.tolist(), expected.tolist())
+                self.assertEqual(replay.statistics, statistics)
+
+    def test_keyframes_stay_under_the_limit(self):
+        replay = Replay(self.records[:1], keyframe_interval=64, max_keyframe_bytes=64 * 1024)
+        for end in range(1000, len(self.records) + 1000, 1000):
+            replay.update(self.records[:end])
+        # The way `main.update_replay` grows a replay while recording.
+
+        self.assertLessEqual(replay.keyframe_bytes, 64 * 1024)
+        self.assertGreater(replay.keyframe_interval, 64)
+        self.assertEqual(replay.keyframe_steps, [keyframe.step for keyframe in replay.keyframes])
+
+        replay.seek(len(self.records))
+        arrays, statistics = [], Statistics()
+        apply_records(arrays, statistics, self.records)
+        self.assertEqual([array.tolist() for array in replay.arrays], [array.tolist() for array in arrays])
+        self.assertEqual(replay.statistics, statistics)
+
+
+if __name__ == "__main__":
+    unittest.main()
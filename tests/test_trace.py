@@ -0,0 +1,67 @@
+from algorithms.playground import SortPlayground, Statistics
+from algorithms.inputs import Linear
+from algorithms.algorithms import Shuffle
+from algorithms.sorts import RadixLSDSort
+from algorithms.trace import TraceRecorder, read_trace, OP_SPAWN, OP_DELETE, OP_RESET
+from algorithms.replay import apply_records
+from itertools import chain
+from tempfile import TemporaryDirectory
+import os
+import unittest
+
+
+class TestTraceRoundTrip(unittest.TestCase):
+    def setUp(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "run.trace")
+
+        self.playground = SortPlayground(300)
+        self.recorder = TraceRecorder(self.path, chunk_records=100)
+        # Small chunks, so the records are flushed several times.
+        self.addCleanup(self.recorder.close)
+        self.playground.start_recording(self.recorder)
+
+    def assert_replays_to_live_state(self):
+        self.recorder.flush()
+        arrays, statistics = [], Statistics()
+        apply_records(arrays, statistics, read_trace(self.path))
+
+        self.assertEqual([array.tolist() for array in arrays], [list(array) for array in self.playground.arrays])
+        self.assertEqual(statistics, self.playground.statistics)
+
+    def test_spawns_deletes_and_resets(self):
+        playground = self.playground
+        steps = chain(Linear(playground).run(), Shuffle(playground).run(), RadixLSDSort(playground).run())
+
+        for _ in steps:
+            if playground.array_count > 1:
+                break
+        self.assert_replays_to_live_state()
+        # In the middle of the sort, with an array spawned.
+
+        for _ in steps:
+            pass
+        self.assert_replays_to_live_state()
+
+        playground.spawn_new_array(10)
+        playground.reset()
+        self.assert_replays_to_live_state()
+
+        opcodes = set(read_trace(self.path)["opcode"].tolist())
+        self.assertLessEqual({OP_SPAWN, OP_DELETE, OP_RESET}, opcodes)
+
+    def test_keeps_64_bit_values(self):
+        playground = self.playground
+        big = [2 ** 62, -2 ** 62, 2 ** 40 + 1]
+
+        for index, num in enumerate(big):
+            playground.write(num, (0, index))
+        playground.increment(2 ** 35, (0, 3))
+        self.assert_replays_to_live_state()
+
+        self.assertEqual(read_trace(self.path)["value"][-4:].tolist(), [*big, 2 ** 35])
+
+
+if __name__ == "__main__":
+    unittest.main()